@@ -0,0 +1,136 @@
+"""Admission control for LLM calls: rate limiting, load shedding and circuit breaking."""
+
+import asyncio
+import logging
+import math
+import time
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class LLMUnavailableError(Exception):
+    """An LLM call was refused before reaching the provider.
+
+    Routes turn it into ``status_code`` with a ``Retry-After`` header instead of a 500.
+    """
+
+    status_code = 503
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+    def headers(self) -> Dict[str, str]:
+        return {"Retry-After": str(max(1, math.ceil(self.retry_after)))}
+
+
+class RateLimitedError(LLMUnavailableError):
+    """The provider quota would not allow the call within the maximum wait."""
+
+    status_code = 429
+
+
+class OverloadedError(LLMUnavailableError):
+    """Too many calls are already waiting for an LLM slot."""
+
+
+class CircuitOpenError(LLMUnavailableError):
+    """The provider failed repeatedly and calls are paused."""
+
+
+class TokenBucket:
+    """Token bucket refilled at ``rate`` tokens per second up to ``burst``.
+
+    Callers reserve a token up front; the bucket may go negative, and the
+    deficit tells each caller how long to wait for its reserved token.
+    """
+
+    def __init__(self, rate: float, burst: int):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.rejected = 0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, max_wait: float) -> None:
+        """Take a token, waiting up to ``max_wait`` seconds for it, else raise RateLimitedError."""
+        if self.rate <= 0:
+            return
+        self._refill()
+        wait = max(0.0, (1 - self.tokens) / self.rate)
+        if wait > max_wait:
+            self.rejected += 1
+            raise RateLimitedError("LLM rate limit reached, try again later", wait)
+        self.tokens -= 1
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def stats(self) -> Dict[str, Any]:
+        self._refill()
+        return {"rate_per_second": self.rate, "burst": self.burst,
+                "tokens": round(self.tokens, 2), "rejected": self.rejected}
+
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Opens after ``failure_threshold`` consecutive failures and rejects calls for
+    ``reset_seconds``; then lets a single trial call through (half-open) and closes
+    again if it succeeds.
+    """
+
+    def __init__(self, failure_threshold: int, reset_seconds: float):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.rejected = 0
+        self.trips = 0
+        self._trial_running = False
+
+    def before_call(self) -> None:
+        if self.failure_threshold <= 0 or self.state == CLOSED:
+            return
+        remaining = self.opened_at + self.reset_seconds - time.monotonic()
+        if self.state == OPEN and remaining <= 0:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN and not self._trial_running:
+            self._trial_running = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError("LLM provider is failing, calls are paused", max(remaining, 1.0))
+
+    def record_success(self) -> None:
+        if self.state != CLOSED:
+            logger.info("LLM circuit breaker closed")
+        self.state = CLOSED
+        self.failures = 0
+        self._trial_running = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_running = False
+        if self.failure_threshold > 0 and (self.state == HALF_OPEN or self.failures >= self.failure_threshold):
+            if self.state != OPEN:
+                self.trips += 1
+                logger.warning(f"LLM circuit breaker opened after {self.failures} consecutive failures")
+            self.state = OPEN
+            self.opened_at = time.monotonic()
+
+    def abandon(self) -> None:
+        """A call allowed by ``before_call`` ended without reaching the provider."""
+        self._trial_running = False
+
+    def stats(self) -> Dict[str, Any]:
+        return {"state": self.state, "consecutive_failures": self.failures,
+                "trips": self.trips, "rejected": self.rejected}
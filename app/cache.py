@@ -0,0 +1,345 @@
+"""TTL + LRU caches with in-process and on-disk backends."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+CACHE_DIR = os.getenv("CACHE_DIR", ".cache")
+
+
+class CacheBackend(ABC):
+    """Interface shared by cache backends.
+
+    Values must be JSON-serializable so that every backend can store them.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    @abstractmethod
+    def __len__(self) -> int:
+        ...
+
+    async def aget(self, key: str) -> Optional[Any]:
+        """``get`` for callers on the event loop; backends doing I/O run it in an executor."""
+        return self.get(key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        self.set(key, value)
+
+    def _expired(self, stored_at: float, now: float) -> bool:
+        return self.ttl_seconds > 0 and now - stored_at > self.ttl_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": type(self).__name__,
+            "entries": len(self),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+class MemoryCache(CacheBackend):
+    """In-process cache backed by an ``OrderedDict`` kept in LRU order."""
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600):
+        super().__init__(max_entries, ttl_seconds)
+        self._entries: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            stored_at, value = entry
+            if self._expired(stored_at, time.time()):
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key: str, value: Any) -> None:
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class DiskCache(CacheBackend):
+    """Persistent cache stored in a SQLite file, evicting least recently used rows.
+
+    Hits only note their access time in memory; the times are written in one batch
+    before the next eviction. The entry count is tracked in memory too and recounted
+    only when it says the cache is full.
+    """
+
+    # Recently used keys whose access time is written in one statement
+    TOUCH_BATCH = 256
+
+    def __init__(self, path: str, max_entries: int = 1024, ttl_seconds: float = 3600):
+        super().__init__(max_entries, ttl_seconds)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        # WAL stays consistent with NORMAL; a crash can only lose the last cache writes
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS entries ("
+            "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+            "stored_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS entries_accessed ON entries (accessed_at)")
+        self._touched: Dict[str, float] = {}
+        self._size = self._count()
+
+    def _count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def _write_touched(self) -> None:
+        if self._touched:
+            self._conn.executemany(
+                "UPDATE entries SET accessed_at = ? WHERE key = ?",
+                [(accessed_at, key) for key, accessed_at in self._touched.items()],
+            )
+            self._touched.clear()
+
+    async def aget(self, key: str) -> Optional[Any]:
+        return await asyncio.get_event_loop().run_in_executor(None, self.get, key)
+
+    async def aset(self, key: str, value: Any) -> None:
+        await asyncio.get_event_loop().run_in_executor(None, self.set, key, value)
+
+    def get(self, key: str) -> Optional[Any]:
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, stored_at FROM entries WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            if self._expired(row[1], now):
+                self._conn.execute("DELETE FROM entries WHERE key = ?", (key,))
+                self._touched.pop(key, None)
+                self._size -= 1
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._touched[key] = now
+            if len(self._touched) >= self.TOUCH_BATCH:
+                self._write_touched()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, key: str, value: Any) -> None:
+        now = time.time()
+        payload = json.dumps(value)
+        with self._lock:
+            existed = self._conn.execute("SELECT 1 FROM entries WHERE key = ?", (key,)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (key, value, stored_at, accessed_at) VALUES (?, ?, ?, ?)",
+                (key, payload, now, now),
+            )
+            self._touched.pop(key, None)
+            if existed is None:
+                self._size += 1
+            if self._size > self.max_entries:
+                # Other processes may share the file, so recount before evicting
+                self._size = self._count()
+                overflow = self._size - self.max_entries
+                if overflow > 0:
+                    self._write_touched()
+                    self._conn.execute(
+                        "DELETE FROM entries WHERE key IN "
+                        "(SELECT key FROM entries ORDER BY accessed_at LIMIT ?)",
+                        (overflow,),
+                    )
+                    self._size -= overflow
+                    self.evictions += overflow
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._size -= self._conn.execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount
+            self._touched.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM entries")
+            self._touched.clear()
+            self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+
+class PageCacheEntry(NamedTuple):
+    digest: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    fetched_at: float
+
+
+class PageCache:
+    """Byte-budgeted cache of extracted page text keyed by URL.
+
+    Texts are stored once per content digest, so mirrors and redirects that
+    resolve to identical text share storage. Each URL keeps its validators
+    (ETag / Last-Modified) so stale entries can be revalidated with a
+    conditional request instead of being downloaded and parsed again.
+    """
+
+    def __init__(self, max_bytes: int = 32 * 1024 * 1024, fresh_seconds: float = 600):
+        self.max_bytes = max_bytes
+        self.fresh_seconds = fresh_seconds
+        self.bytes_used = 0
+        self.hits = 0
+        self.revalidations = 0
+        self.misses = 0
+        self.evictions = 0
+        self._urls: "OrderedDict[str, PageCacheEntry]" = OrderedDict()
+        self._texts: Dict[str, str] = {}
+        self._refs: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, url: str) -> Optional[PageCacheEntry]:
+        """Return the entry for ``url`` (fresh or stale) and mark it recently used."""
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._urls.move_to_end(url)
+            return entry
+
+    def is_fresh(self, entry: PageCacheEntry) -> bool:
+        return time.time() - entry.fetched_at <= self.fresh_seconds
+
+    def text(self, entry: PageCacheEntry) -> str:
+        """Return the text for a fresh entry, counting a hit."""
+        self.hits += 1
+        return self._texts.get(entry.digest, "")
+
+    def revalidated(self, url: str) -> Optional[str]:
+        """Refresh an entry after a ``304 Not Modified`` and return its text."""
+        with self._lock:
+            entry = self._urls.get(url)
+            if entry is None:
+                return None
+            self._urls[url] = entry._replace(fetched_at=time.time())
+            self.revalidations += 1
+            return self._texts.get(entry.digest)
+
+    def store(self, url: str, text: str, etag: Optional[str], last_modified: Optional[str]) -> None:
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()
+        size = len(text.encode("utf-8"))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            self._release(url)
+            if digest not in self._texts:
+                self._texts[digest] = text
+                self.bytes_used += size
+            self._refs[digest] = self._refs.get(digest, 0) + 1
+            self._urls[url] = PageCacheEntry(digest, etag, last_modified, time.time())
+            while self.bytes_used > self.max_bytes and self._urls:
+                oldest = next(iter(self._urls))
+                self._release(oldest)
+                self.evictions += 1
+
+    def _release(self, url: str) -> None:
+        entry = self._urls.pop(url, None)
+        if entry is None:
+            return
+        self._refs[entry.digest] -= 1
+        if self._refs[entry.digest] == 0:
+            del self._refs[entry.digest]
+            self.bytes_used -= len(self._texts.pop(entry.digest).encode("utf-8"))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "urls": len(self._urls),
+            "unique_texts": len(self._texts),
+            "bytes_used": self.bytes_used,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "revalidations": self.revalidations,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+
+def create_cache(backend: str, name: str, max_entries: int, ttl_seconds: float) -> Optional[CacheBackend]:
+    """Build a cache for ``backend`` ("memory", "disk" or "none")."""
+    backend = backend.lower()
+    if backend == "none":
+        return None
+    if backend == "disk":
+        return DiskCache(os.path.join(CACHE_DIR, f"{name}.sqlite3"), max_entries, ttl_seconds)
+    if backend != "memory":
+        logger.warning(f"Unknown cache backend '{backend}' for {name}, using memory")
+    return MemoryCache(max_entries, ttl_seconds)
+
+
+def normalize_key_part(value: str) -> str:
+    """Normalize free text (e.g. a topic) so trivially different spellings share a key."""
+    return " ".join(re.findall(r"\w+", value.lower()))
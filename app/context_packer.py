@@ -0,0 +1,124 @@
+"""Token-budgeted packing of research context into prompts."""
+
+import logging
+import math
+import os
+import re
+from typing import List, Sequence
+
+from .fingerprint import hamming, simhash
+from .schemas import ResearchInfo
+
+logger = logging.getLogger(__name__)
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - tiktoken is optional
+    tiktoken = None
+
+RESEARCH_CONTEXT_TOKENS = int(os.getenv("RESEARCH_CONTEXT_TOKENS", "1500"))
+QUIZ_CONTEXT_TOKENS = int(os.getenv("QUIZ_CONTEXT_TOKENS", "1000"))
+PASSAGE_TOKENS = 80
+# Passages whose SimHash fingerprints are at most this many bits apart are duplicates
+DUPLICATE_DISTANCE = 3
+
+_encoding = None
+_WORD = re.compile(r"[a-z0-9]+")
+_SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+
+def count_tokens(text: str) -> int:
+    """Count tokens with tiktoken when installed, else estimate ~4 characters per token."""
+    global _encoding
+    if tiktoken is not None:
+        if _encoding is None:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        return len(_encoding.encode(text))
+    return math.ceil(len(text) / 4)
+
+
+def split_passages(text: str, max_tokens: int = PASSAGE_TOKENS) -> List[str]:
+    """Split text into passages of whole sentences of at most ~``max_tokens`` each."""
+    passages: List[str] = []
+    current: List[str] = []
+    size = 0
+    for sentence in _SENTENCE_END.split(text.strip()):
+        tokens = count_tokens(sentence)
+        if current and size + tokens > max_tokens:
+            passages.append(" ".join(current))
+            current, size = [], 0
+        current.append(sentence)
+        size += tokens
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+class _Deduper:
+    def __init__(self):
+        self._seen: List[int] = []
+
+    def is_new(self, text: str) -> bool:
+        fingerprint = simhash(text)
+        if any(hamming(fingerprint, other) <= DUPLICATE_DISTANCE for other in self._seen):
+            return False
+        self._seen.append(fingerprint)
+        return True
+
+
+def pack_sources(sources: Sequence[ResearchInfo], topic: str, budget: int = RESEARCH_CONTEXT_TOKENS) -> str:
+    """Pack the most relevant, non-duplicate source passages into ``budget`` tokens.
+
+    Passages are ranked by their source's relevance score, how many topic words
+    they contain and how early they appear on the page. Selected passages are
+    emitted grouped by source, in their original order.
+    """
+    topic_words = set(_WORD.findall(topic.lower()))
+    candidates = []
+    for source_index, source in enumerate(sources):
+        if not source.content:
+            continue
+        for position, passage in enumerate(split_passages(source.content)):
+            words = set(_WORD.findall(passage.lower()))
+            overlap = len(topic_words & words) / len(topic_words) if topic_words else 0.0
+            score = source.relevance_score + overlap + 0.2 / (1 + position)
+            candidates.append((score, source_index, position, passage))
+
+    deduper = _Deduper()
+    selected = []
+    used = 0
+    for candidate in sorted(candidates, key=lambda item: item[0], reverse=True):
+        passage = candidate[3]
+        tokens = count_tokens(passage)
+        if used + tokens > budget or not deduper.is_new(passage):
+            continue
+        selected.append(candidate)
+        used += tokens
+
+    selected.sort(key=lambda item: (item[1], item[2]))
+    blocks = []
+    for source_index in sorted({item[1] for item in selected}):
+        content = " ".join(item[3] for item in selected if item[1] == source_index)
+        blocks.append(f"Source: {sources[source_index].source}\nContent: {content}")
+    logger.info(f"Packed {len(selected)}/{len(candidates)} research passages into {used}/{budget} tokens")
+    return "\n\n".join(blocks)
+
+
+def pack_lines(items: Sequence[str], budget: int) -> List[str]:
+    """Keep items in order, dropping near duplicates, until ``budget`` tokens are used."""
+    deduper = _Deduper()
+    packed: List[str] = []
+    used = 0
+    for item in items:
+        tokens = count_tokens(item) + 1
+        if used + tokens > budget:
+            break
+        if deduper.is_new(item):
+            packed.append(item)
+            used += tokens
+    return packed
+
+
+def pack_text(text: str, budget: int) -> str:
+    """Truncate text to whole sentences that fit ``budget`` tokens."""
+    return " ".join(pack_lines(_SENTENCE_END.split(text.strip()), budget))
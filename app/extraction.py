@@ -0,0 +1,199 @@
+"""Incremental main-content text extraction for research pages."""
+
+import codecs
+import logging
+import re
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+try:
+    from lxml import etree
+except ImportError:  # pragma: no cover - lxml is optional
+    etree = None
+
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+
+SKIP_TAGS = {"script", "style", "nav", "footer", "header", "noscript", "template"}
+BLOCK_TAGS = {
+    "p", "div", "br", "li", "tr", "td", "th", "section", "article", "main",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "dd", "dt",
+}
+MAIN_CLASS_RE = re.compile(r"content|main")
+# Main-content regions in order of preference
+MAIN_REGIONS = ("main", "article", "div")
+META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([a-zA-Z0-9_.:-]+)""", re.IGNORECASE)
+DEFAULT_ENCODING = "utf-8"
+WHITESPACE_RE = re.compile(r"\s+")
+
+
+def sniff_encoding(head: bytes) -> str:
+    """Encoding of a document without a charset header: BOM, then ``<meta charset>``, else UTF-8."""
+    if head.startswith(b"\xef\xbb\xbf"):
+        return "utf-8"
+    if head.startswith((b"\xff\xfe", b"\xfe\xff")):
+        return "utf-16"
+    match = META_CHARSET_RE.search(head[:4096])
+    if match:
+        name = match.group(1).decode("ascii", "ignore")
+        try:
+            return codecs.lookup(name).name
+        except LookupError:
+            logger.debug(f"Unknown charset '{name}' in page, using {DEFAULT_ENCODING}")
+    return DEFAULT_ENCODING
+
+
+def is_html_content_type(content_type: Optional[str]) -> bool:
+    """Return True when a Content-Type header denotes an HTML document.
+
+    A missing header is treated as HTML so that misconfigured servers still work.
+    """
+    if not content_type:
+        return True
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return media_type in HTML_CONTENT_TYPES
+
+
+class _Region:
+    """Text collected inside the first element of one kind of main-content region."""
+
+    def __init__(self):
+        self.depth = 0
+        self.closed = False
+        self.parts: List[str] = []
+        self.length = 0
+
+
+class _MainTextTarget:
+    """lxml parser target that collects text without building a tree.
+
+    Like the BeautifulSoup fallback, the text of the first ``<main>`` is preferred,
+    then the first ``<article>``, then the first ``div.content``/``div.main``, then
+    the whole page. ``done`` flips once a ``<main>`` or ``<article>`` has collected
+    ``limit`` characters; class-matched divs (``dropdown-content``, ``tab-content``...)
+    are too often page chrome to stop the download on.
+    """
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.depth = 0
+        self.skip_depth = 0
+        self.regions = {kind: _Region() for kind in MAIN_REGIONS}
+        self.page_parts: List[str] = []
+        self.page_length = 0
+        self.done = False
+
+    def start(self, tag, attrib):
+        self.depth += 1
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if self.skip_depth or tag in SKIP_TAGS:
+            self.skip_depth = self.skip_depth or self.depth
+            return
+        kind = self._region_kind(tag, attrib)
+        if kind is not None:
+            region = self.regions[kind]
+            if not region.depth and not region.closed:
+                region.depth = self.depth
+
+    def end(self, tag):
+        tag = tag.lower() if isinstance(tag, str) else ""
+        if tag in BLOCK_TAGS and not self.skip_depth:
+            self._append(" ")
+        if self.skip_depth == self.depth:
+            self.skip_depth = 0
+        for region in self.regions.values():
+            if region.depth == self.depth:
+                region.depth = 0
+                region.closed = True
+        self.depth -= 1
+
+    def data(self, data):
+        if not self.skip_depth:
+            self._append(data)
+
+    def comment(self, text):
+        pass
+
+    def close(self) -> str:
+        parts = next((region.parts for region in self.regions.values() if region.length), self.page_parts)
+        return WHITESPACE_RE.sub(" ", "".join(parts)).strip()[: self.limit]
+
+    @staticmethod
+    def _region_kind(tag: str, attrib) -> Optional[str]:
+        if tag in ("main", "article"):
+            return tag
+        if tag == "div" and MAIN_CLASS_RE.search(attrib.get("class", "") or ""):
+            return "div"
+        return None
+
+    def _append(self, text: str) -> None:
+        text = WHITESPACE_RE.sub(" ", text)
+        if not text:
+            return
+        for kind, region in self.regions.items():
+            if region.depth and region.length < self.limit:
+                region.parts.append(text)
+                region.length += len(text)
+                if kind != "div" and region.length >= self.limit:
+                    self.done = True
+        if self.page_length < self.limit:
+            self.page_parts.append(text)
+            self.page_length += len(text)
+
+
+class PageTextExtractor:
+    """Feed raw HTML bytes in chunks and stop as soon as enough text is collected.
+
+    Uses lxml's event-driven HTML parser when available; otherwise the bytes are
+    buffered and parsed with BeautifulSoup's ``html.parser`` on ``close()``.
+    Without an ``encoding`` (no charset in the Content-Type header) lxml gets one
+    sniffed from the first chunk instead of guessing Latin-1.
+    """
+
+    def __init__(self, limit: int = 2000, encoding: Optional[str] = None):
+        self.limit = limit
+        self.encoding = encoding
+        self._buffer: List[bytes] = []
+        self._target: Optional[_MainTextTarget] = None
+        self._parser = None
+
+    def feed(self, chunk: bytes) -> bool:
+        """Consume a chunk of the document. Returns True once extraction is complete."""
+        if etree is None:
+            self._buffer.append(chunk)
+            return False
+        if self._parser is None:
+            if not chunk:
+                return False
+            self._target = _MainTextTarget(self.limit)
+            self._parser = etree.HTMLParser(target=self._target, encoding=self.encoding or sniff_encoding(chunk))
+        self._parser.feed(chunk)
+        return self._target.done
+
+    def close(self) -> str:
+        """Finish parsing and return the cleaned text."""
+        if etree is None:
+            return _extract_with_soup(b"".join(self._buffer), self.limit)
+        if self._parser is None:
+            return ""
+        if not self._target.done:
+            try:
+                self._parser.close()
+            except etree.LxmlError as e:
+                logger.debug(f"HTML parser did not close cleanly: {e}")
+        return self._target.close()
+
+
+def _extract_with_soup(content: bytes, limit: int) -> str:
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(content, "html.parser")
+
+    # Remove script and style elements
+    for script in soup(list(SKIP_TAGS)):
+        script.decompose()
+
+    # Focus on main content areas
+    main_content = soup.find("main") or soup.find("article") or soup.find("div", class_=MAIN_CLASS_RE)
+    text = main_content.get_text(" ") if main_content else soup.get_text(" ")
+    return WHITESPACE_RE.sub(" ", text).strip()[:limit]
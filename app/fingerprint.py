@@ -0,0 +1,25 @@
+"""SimHash fingerprints for near-duplicate text detection."""
+
+import hashlib
+import re
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+
+def simhash(text: str) -> int:
+    """64-bit SimHash of the word unigrams and bigrams of ``text``.
+
+    Texts that differ in a few words get fingerprints a small Hamming distance apart.
+    """
+    tokens = _TOKEN.findall(text.lower())
+    features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    weights = [0] * 64
+    for feature in features:
+        h = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), "big")
+        for bit in range(64):
+            weights[bit] += 1 if h >> bit & 1 else -1
+    return sum(1 << bit for bit in range(64) if weights[bit] > 0)
+
+
+def hamming(a: int, b: int) -> int:
+    return bin(a ^ b).count("1")
@@ -0,0 +1,174 @@
+"""Answer keys and grading of quiz submissions."""
+
+import json
+import logging
+from typing import Dict, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from .schemas import (
+    AnswerSheet,
+    BulkSubmitResponse,
+    QuestionResult,
+    QuizBundle,
+    QuizGradeStats,
+    SheetResult,
+    SubmitAnswer,
+    SubmitQuizResponse,
+)
+
+logger = logging.getLogger(__name__)
+
+NO_EXPLANATION = "No explanation available"
+
+
+class NoGradableAnswersError(ValueError):
+    """Raised when none of the submitted answers match a gradable question."""
+
+
+class AnswerKey:
+    """Compact answer key of one quiz, built once when the quiz is stored.
+
+    Question ids, correct options and explanations are kept in parallel tuples;
+    ``index`` maps a questionId to its position, so grading an answer is a dict
+    lookup plus a string comparison. Questions without a correct answer are left
+    out. If ids repeat, answers are graded against the first question with the id.
+    """
+
+    __slots__ = ("quiz_id", "question_ids", "index", "correct", "explanations")
+
+    def __init__(self, quiz_id: UUID, question_ids: Sequence[int],
+                 correct: Sequence[str], explanations: Sequence[str]):
+        if not len(question_ids) == len(correct) == len(explanations):
+            raise ValueError("Answer key columns differ in length")
+        self.quiz_id = quiz_id
+        self.question_ids: Tuple[int, ...] = tuple(question_ids)
+        self.index: Dict[int, int] = {}
+        for pos, qid in enumerate(self.question_ids):
+            self.index.setdefault(qid, pos)
+        self.correct: Tuple[str, ...] = tuple(correct)
+        self.explanations: Tuple[str, ...] = tuple(explanations)
+
+    @classmethod
+    def from_bundle(cls, bundle: QuizBundle) -> "AnswerKey":
+        question_ids, correct, explanations = [], [], []
+        for q in bundle.questions:
+            if not q.correct_answer:
+                logger.warning(f"No correct answer for question: {q.questionId}")
+                continue
+            question_ids.append(q.questionId)
+            correct.append(next(iter(q.correct_answer)))
+            explanations.append(q.explanation or NO_EXPLANATION)
+        return cls(bundle.quizId, question_ids, correct, explanations)
+
+    def to_json(self) -> str:
+        return json.dumps([self.question_ids, self.correct, self.explanations], separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, quiz_id: UUID, payload: str) -> "AnswerKey":
+        question_ids, correct, explanations = json.loads(payload)
+        return cls(quiz_id, question_ids, correct, explanations)
+
+    def __len__(self) -> int:
+        return len(self.correct)
+
+
+def grade_submission(key: AnswerKey, answers: List[SubmitAnswer]) -> SubmitQuizResponse:
+    """Grade one answer sheet; answers to unknown questions are skipped."""
+    results: List[QuestionResult] = []
+    correct_count = 0
+    for ans in answers:
+        pos = key.index.get(ans.questionId)
+        if pos is None:
+            logger.warning(f"Question not found: {ans.questionId}")
+            continue
+        correct_option = key.correct[pos]
+        is_correct = ans.selectedOption == correct_option
+        correct_count += is_correct
+        results.append(
+            QuestionResult(
+                questionId=ans.questionId,
+                yourAnswer=ans.selectedOption,
+                correctOption=correct_option,
+                isCorrect=is_correct,
+                explanation=key.explanations[pos],
+            )
+        )
+
+    total_questions = len(results)  # Use actual processed questions
+    if total_questions == 0:
+        raise NoGradableAnswersError("No valid questions found to evaluate")
+
+    return SubmitQuizResponse(
+        quizId=key.quiz_id,
+        score=int((correct_count / total_questions) * 100),
+        correctAnswers=correct_count,
+        totalQuestions=total_questions,
+        results=results,
+    )
+
+
+class GradeStats:
+    """Running aggregate over the graded answer sheets of one quiz."""
+
+    def __init__(self, key: AnswerKey):
+        self.key = key
+        self.sheets = 0
+        self.scores: List[int] = []
+        # Per answer-key position, so accumulating is index arithmetic only
+        self.answered = [0] * len(key)
+        self.correct = [0] * len(key)
+
+    def add(self, response: Optional[SubmitQuizResponse]) -> None:
+        self.sheets += 1
+        if response is None:
+            return
+        self.scores.append(response.score)
+        index = self.key.index
+        for result in response.results:
+            pos = index[result.questionId]
+            self.answered[pos] += 1
+            self.correct[pos] += result.isCorrect
+
+    def summary(self) -> QuizGradeStats:
+        scores = self.scores
+        question_ids = self.key.question_ids
+        return QuizGradeStats(
+            quizId=self.key.quiz_id,
+            sheets=self.sheets,
+            graded=len(scores),
+            meanScore=round(sum(scores) / len(scores), 2) if scores else 0.0,
+            minScore=min(scores, default=0),
+            maxScore=max(scores, default=0),
+            questionAccuracy={
+                question_ids[pos]: round(self.correct[pos] / answered, 4)
+                for pos, answered in enumerate(self.answered) if answered
+            },
+        )
+
+
+def grade_sheets(sheets: List[AnswerSheet], keys: Dict[UUID, AnswerKey],
+                 missing: Dict[UUID, str]) -> BulkSubmitResponse:
+    """Grade many answer sheets in one pass against already loaded answer keys.
+
+    ``missing`` maps quiz IDs without an answer key to the error reported for
+    their sheets.
+    """
+    results: List[SheetResult] = []
+    stats: Dict[UUID, GradeStats] = {}
+    for sheet in sheets:
+        key = keys.get(sheet.quizId)
+        if key is None:
+            results.append(SheetResult(quizId=sheet.quizId, sheetId=sheet.sheetId,
+                                       error=missing.get(sheet.quizId, "Quiz not found")))
+            continue
+        response: Optional[SubmitQuizResponse] = None
+        error: Optional[str] = None
+        try:
+            response = grade_submission(key, sheet.answers)
+        except NoGradableAnswersError as e:
+            error = str(e)
+        if sheet.quizId not in stats:
+            stats[sheet.quizId] = GradeStats(key)
+        stats[sheet.quizId].add(response)
+        results.append(SheetResult(quizId=sheet.quizId, sheetId=sheet.sheetId, result=response, error=error))
+    return BulkSubmitResponse(results=results, stats=[s.summary() for s in stats.values()])
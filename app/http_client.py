@@ -0,0 +1,91 @@
+"""Shared async HTTP client used for web research."""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, List, Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_PER_HOST_LIMIT = int(os.getenv("HTTP_PER_HOST_LIMIT", "4"))
+HTTP_TIMEOUT_SECONDS = float(os.getenv("HTTP_TIMEOUT_SECONDS", "10"))
+
+USER_AGENT = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
+)
+
+_client: Optional[httpx.AsyncClient] = None
+# Per-host [semaphore, requests holding or waiting for it]; dropped once a host is idle
+_host_slots: Dict[str, List] = {}
+
+
+def _http2_available() -> bool:
+    """Return True when the optional ``h2`` package is installed."""
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def _build_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=_http2_available(),
+        headers={"User-Agent": USER_AGENT},
+        timeout=httpx.Timeout(HTTP_TIMEOUT_SECONDS),
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        ),
+        follow_redirects=True,
+    )
+
+
+async def start_http_client() -> httpx.AsyncClient:
+    """Create the application-wide client. Called from the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+        logger.info(f"HTTP client started (http2={_http2_available()})")
+    return _client
+
+
+async def close_http_client() -> None:
+    """Close the application-wide client and release pooled connections."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+    _host_slots.clear()
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Return the shared client, creating it lazily outside the app lifespan."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = _build_client()
+    return _client
+
+
+@asynccontextmanager
+async def host_slot(url: str) -> AsyncIterator[None]:
+    """Limit the number of concurrent requests made to a single host."""
+    host = urlsplit(url).netloc.lower()
+    slot = _host_slots.get(host)
+    if slot is None:
+        slot = _host_slots[host] = [asyncio.Semaphore(HTTP_PER_HOST_LIMIT), 0]
+    slot[1] += 1
+    try:
+        async with slot[0]:
+            yield
+    finally:
+        slot[1] -= 1
+        if slot[1] == 0 and _host_slots.get(host) is slot:
+            del _host_slots[host]
@@ -0,0 +1,155 @@
+"""Background job queue for quiz generation."""
+
+import asyncio
+import logging
+import os
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, List, Optional
+from uuid import UUID
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+JOB_HISTORY_SIZE = int(os.getenv("JOB_HISTORY_SIZE", "1000"))
+
+PENDING = "pending"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+class QueueFullError(Exception):
+    """Raised when the job queue cannot accept more work."""
+
+
+class QuizJob:
+    """A unit of background generation work tracked by quiz ID."""
+
+    def __init__(self, quiz_id: UUID, kind: str, run: Callable[[], Awaitable[None]],
+                 topic: str = "", difficulty: str = ""):
+        self.quiz_id = quiz_id
+        self.kind = kind
+        self.run = run
+        self.topic = topic
+        self.difficulty = difficulty
+        self.status = PENDING
+        self.error: Optional[str] = None
+        self.exception: Optional[Exception] = None
+        self.done = asyncio.Event()
+
+    async def wait(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the job to finish. Returns False if ``timeout`` elapsed first."""
+        try:
+            await asyncio.wait_for(self.done.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+
+class JobQueue:
+    """Bounded queue drained by a fixed pool of worker tasks.
+
+    Finished jobs are kept in a bounded history so that clients polling for a
+    quiz can still observe a ``failed`` status and its error.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS, max_pending: int = JOB_QUEUE_SIZE,
+                 history_size: int = JOB_HISTORY_SIZE):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.history_size = history_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._jobs: "OrderedDict[UUID, QuizJob]" = OrderedDict()
+        # Called on every status change, e.g. to publish it to other workers
+        self.status_listener: Optional[Callable[[QuizJob], None]] = None
+        self.completed = 0
+        self.failed = 0
+
+    async def start(self) -> None:
+        self._ensure_workers()
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, quiz_id: UUID, kind: str, run: Callable[[], Awaitable[None]],
+               topic: str = "", difficulty: str = "") -> QuizJob:
+        """Enqueue ``run`` for ``quiz_id`` without waiting for it to execute."""
+        self._ensure_workers()
+        job = QuizJob(quiz_id, kind, run, topic, difficulty)
+        try:
+            self._queue.put_nowait(job)
+        except asyncio.QueueFull:
+            raise QueueFullError("Quiz generation queue is full, try again later")
+        self._jobs[quiz_id] = job
+        self._trim_history()
+        self._notify(job)
+        return job
+
+    def get(self, quiz_id: UUID) -> Optional[QuizJob]:
+        return self._jobs.get(quiz_id)
+
+    def forget(self, quiz_id: UUID) -> None:
+        self._jobs.pop(quiz_id, None)
+
+    def _notify(self, job: QuizJob) -> None:
+        if self.status_listener is not None:
+            try:
+                self.status_listener(job)
+            except Exception as e:
+                logger.error(f"Job status listener failed for {job.quiz_id}: {e}")
+
+    def _ensure_workers(self) -> None:
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.max_pending)
+        if not self._tasks:
+            self._tasks = [asyncio.ensure_future(self._worker(i)) for i in range(self.workers)]
+
+    def _trim_history(self) -> None:
+        # Only finished jobs are dropped; pending/running ones stay visible
+        overflow = len(self._jobs) - self.history_size
+        for quiz_id in [qid for qid, job in self._jobs.items() if job.done.is_set()][:max(0, overflow)]:
+            del self._jobs[quiz_id]
+
+    async def _worker(self, index: int) -> None:
+        while True:
+            job: QuizJob = await self._queue.get()
+            job.status = RUNNING
+            self._notify(job)
+            try:
+                await job.run()
+                job.status = COMPLETED
+                self.completed += 1
+            except asyncio.CancelledError:
+                job.status = FAILED
+                job.error = "Job cancelled"
+                raise
+            except Exception as e:
+                logger.error(f"Job {job.quiz_id} ({job.kind}) failed: {e}")
+                job.status = FAILED
+                job.error = str(e)
+                job.exception = e
+                self.failed += 1
+            finally:
+                self._notify(job)
+                job.done.set()
+                self._queue.task_done()
+
+    def stats(self) -> Dict[str, int]:
+        running = sum(1 for job in self._jobs.values() if job.status == RUNNING)
+        return {
+            "workers": len(self._tasks),
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "max_pending": self.max_pending,
+            "running": running,
+            "completed": self.completed,
+            "failed": self.failed,
+        }
+
+
+job_queue = JobQueue()
@@ -0,0 +1,288 @@
+"""LLM access layer: routed, native async invocation with bounded concurrency and timeouts."""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional
+
+from dotenv import load_dotenv
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import BasePromptTemplate
+from pydantic import BaseModel
+from langchain_groq import ChatGroq
+
+from .admission import CircuitBreaker, LLMUnavailableError, OverloadedError, TokenBucket
+from .cache import create_cache
+from .model_router import LARGE, SMALL, TIERS, Backend, ModelRouter
+from .schemas import QuizBundleLLM
+
+try:
+    from langchain_openai import ChatOpenAI
+except ImportError:  # pragma: no cover - langchain-openai is optional
+    ChatOpenAI = None
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+LLM_MODEL = os.getenv("LLM_MODEL", "deepseek-r1-distill-llama-70b")
+# Smaller Groq model for cheap steps such as research summaries ("" disables it)
+LLM_SMALL_MODEL = os.getenv("LLM_SMALL_MODEL", "llama-3.1-8b-instant")
+LLM_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY", "8"))
+LLM_TIMEOUT_SECONDS = float(os.getenv("LLM_TIMEOUT_SECONDS", "90"))
+
+# Optional OpenAI-compatible server (vLLM, Ollama, llama.cpp...), e.g. http://localhost:11434/v1
+LLM_LOCAL_BASE_URL = os.getenv("LLM_LOCAL_BASE_URL", "")
+LLM_LOCAL_MODEL = os.getenv("LLM_LOCAL_MODEL", "llama3.1")
+LLM_LOCAL_API_KEY = os.getenv("LLM_LOCAL_API_KEY", "not-needed")
+LLM_LOCAL_TIERS = os.getenv("LLM_LOCAL_TIERS", "large,small")
+
+# ---- Admission control ----
+# Provider quota per Groq model (0 disables the limiter) and how long a call may wait for it
+LLM_RATE_LIMIT_PER_MINUTE = float(os.getenv("LLM_RATE_LIMIT_PER_MINUTE", "30"))
+LLM_RATE_BURST = int(os.getenv("LLM_RATE_BURST", "10"))
+LLM_MAX_WAIT_SECONDS = float(os.getenv("LLM_MAX_WAIT_SECONDS", "15"))
+# Calls beyond this many waiting for a slot are shed immediately
+LLM_MAX_WAITING = int(os.getenv("LLM_MAX_WAITING", "64"))
+LLM_BREAKER_FAILURES = int(os.getenv("LLM_BREAKER_FAILURES", "5"))
+LLM_BREAKER_RESET_SECONDS = float(os.getenv("LLM_BREAKER_RESET_SECONDS", "30"))
+
+# ---- Routing ----
+LLM_ROUTER_WINDOW_SECONDS = float(os.getenv("LLM_ROUTER_WINDOW_SECONDS", "300"))
+LLM_ROUTER_MAX_ERROR_RATE = float(os.getenv("LLM_ROUTER_MAX_ERROR_RATE", "0.5"))
+LLM_ROUTER_MIN_SAMPLES = int(os.getenv("LLM_ROUTER_MIN_SAMPLES", "4"))
+
+# Output types a backend's chat model can be bound to
+TEXT = "text"
+# Also returns the raw message, so valid questions can be salvaged when the bundle fails to parse
+QUIZ_BUNDLE = "quiz_bundle"
+_OUTPUTS: Dict[str, Callable[[Any], Any]] = {
+    TEXT: lambda model: model,
+    QUIZ_BUNDLE: lambda model: model.with_structured_output(QuizBundleLLM, include_raw=True),
+}
+
+
+def _backend(name: str, model_name: str, chat_model: Any, tiers, rate_per_minute: float) -> Backend:
+    return Backend(
+        name, model_name, chat_model, frozenset(tiers),
+        TokenBucket(rate_per_minute / 60, LLM_RATE_BURST),
+        CircuitBreaker(LLM_BREAKER_FAILURES, LLM_BREAKER_RESET_SECONDS),
+        LLM_ROUTER_WINDOW_SECONDS,
+    )
+
+
+def configured_backends() -> List[Backend]:
+    backends = []
+    if LLM_MODEL:
+        backends.append(_backend("groq", LLM_MODEL, ChatGroq(model=LLM_MODEL, temperature=0),
+                                 [LARGE], LLM_RATE_LIMIT_PER_MINUTE))
+    if LLM_SMALL_MODEL:
+        backends.append(_backend("groq-small", LLM_SMALL_MODEL, ChatGroq(model=LLM_SMALL_MODEL, temperature=0),
+                                 [SMALL], LLM_RATE_LIMIT_PER_MINUTE))
+    if LLM_LOCAL_BASE_URL:
+        tiers = [tier.strip() for tier in LLM_LOCAL_TIERS.split(",") if tier.strip() in TIERS]
+        if ChatOpenAI is None:
+            logger.error("LLM_LOCAL_BASE_URL is set but langchain-openai is not installed; skipping local backend")
+        else:
+            model = ChatOpenAI(model=LLM_LOCAL_MODEL, base_url=LLM_LOCAL_BASE_URL,
+                               api_key=LLM_LOCAL_API_KEY, temperature=0)
+            # A local server has no provider quota
+            backends.append(_backend("local", LLM_LOCAL_MODEL, model, tiers or TIERS, 0))
+    return backends
+
+
+router = ModelRouter(configured_backends(), LLM_ROUTER_MAX_ERROR_RATE, LLM_ROUTER_MIN_SAMPLES)
+
+# ---- Response cache ----
+# With temperature 0 identical prompts give reusable answers. Bump the version to
+# invalidate every cached response, e.g. after changing how outputs are parsed.
+LLM_CACHE_VERSION = "2"
+LLM_CACHE_BACKEND = os.getenv("LLM_CACHE_BACKEND", "disk")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "2048"))
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600)))
+response_cache = create_cache(LLM_CACHE_BACKEND, "llm_responses", LLM_CACHE_MAX_ENTRIES, LLM_CACHE_TTL_SECONDS)
+
+_CACHEABLE_MODELS = {model.__name__: model for model in (QuizBundleLLM,)}
+_cache_enabled: ContextVar[bool] = ContextVar("llm_cache_enabled", default=True)
+
+
+@contextmanager
+def fresh_responses() -> Iterator[None]:
+    """Bypass the response cache for calls made in this context, e.g. to get new questions."""
+    token = _cache_enabled.set(False)
+    try:
+        yield
+    finally:
+        _cache_enabled.reset(token)
+
+
+def response_key(prompt: BasePromptTemplate, inputs: Dict[str, Any], output: str, model_name: str) -> str:
+    """Key a call by model, template hash, output type and rendered prompt."""
+    template = getattr(prompt, "template", None) or repr(prompt)
+    rendered = prompt.format(**inputs)
+    return hashlib.sha256(json.dumps([
+        LLM_CACHE_VERSION, model_name, hashlib.sha256(template.encode()).hexdigest(), output, rendered
+    ]).encode()).hexdigest()
+
+
+def _encode_response(result: Any) -> Optional[Dict[str, Any]]:
+    if isinstance(result, BaseModel) and type(result).__name__ in _CACHEABLE_MODELS:
+        return {"model": type(result).__name__, "data": result.model_dump()}
+    if isinstance(result, AIMessage):
+        return {"message": result.content}
+    return None
+
+
+def _decode_response(value: Dict[str, Any]) -> Any:
+    if "model" in value:
+        return _CACHEABLE_MODELS[value["model"]].model_validate(value["data"])
+    return AIMessage(content=value["message"])
+
+# Created lazily so it binds to the running event loop
+_semaphore: Optional[asyncio.Semaphore] = None
+_in_flight = 0
+_waiting = 0
+_shed = 0
+
+
+def _get_semaphore() -> asyncio.Semaphore:
+    global _semaphore
+    if _semaphore is None:
+        _semaphore = asyncio.Semaphore(LLM_CONCURRENCY)
+    return _semaphore
+
+
+async def _admit(tier: str) -> Backend:
+    """Pick the first candidate backend whose breaker and quota admit the call.
+
+    Only the last candidate may wait for its rate limit; earlier ones are skipped
+    unless a token is available right away.
+    """
+    candidates = router.candidates(tier)
+    error: Optional[LLMUnavailableError] = None
+    for position, backend in enumerate(candidates):
+        try:
+            backend.breaker.before_call()
+        except LLMUnavailableError as e:
+            error = e
+            continue
+        last = position == len(candidates) - 1
+        try:
+            await backend.rate_limiter.acquire(LLM_MAX_WAIT_SECONDS if last else 0.0)
+        except LLMUnavailableError as e:
+            backend.breaker.abandon()
+            error = e
+            continue
+        except BaseException:
+            backend.breaker.abandon()
+            raise
+        router.record_route(backend)
+        return backend
+    raise error
+
+
+@asynccontextmanager
+async def llm_slot(tier: str = LARGE) -> AsyncIterator[Backend]:
+    """Route a call to a backend and hold one of the ``LLM_CONCURRENCY`` slots for it.
+
+    Admission fails fast with an ``LLMUnavailableError`` when the wait queue is full
+    or no backend for the tier admits the call (open breaker, rate limit not met in
+    time). The call's latency or failure is recorded against the chosen backend.
+    """
+    global _in_flight, _waiting, _shed
+    if _waiting >= LLM_MAX_WAITING:
+        _shed += 1
+        rate = sum(backend.rate_limiter.rate for backend in router.backends)
+        raise OverloadedError("Too many LLM calls waiting, try again later", _waiting / rate if rate > 0 else 1.0)
+    _waiting += 1
+    backend: Optional[Backend] = None
+    try:
+        backend = await _admit(tier)
+        await _get_semaphore().acquire()
+    except BaseException:
+        if backend is not None:
+            backend.breaker.abandon()
+        raise
+    finally:
+        _waiting -= 1
+    _in_flight += 1
+    started = time.monotonic()
+    try:
+        yield backend
+    except Exception:
+        backend.record_failure()
+        raise
+    except BaseException:
+        backend.breaker.abandon()
+        raise
+    else:
+        backend.record_success(time.monotonic() - started)
+    finally:
+        _in_flight -= 1
+        _get_semaphore().release()
+
+
+async def ainvoke(prompt: BasePromptTemplate, inputs: Dict[str, Any], output: str = TEXT, tier: str = LARGE,
+                  timeout: Optional[float] = None, postprocess: Optional[Callable[[Any], Any]] = None) -> Any:
+    """Run ``prompt`` on the best backend for ``tier`` under the concurrency limit and a timeout.
+
+    ``output`` selects how the model's answer is parsed (``TEXT`` or ``QUIZ_BUNDLE``) and
+    ``postprocess`` converts the raw result before it is returned and cached. A cached
+    response from any model serving the tier is reused.
+    """
+    use_cache = response_cache is not None and _cache_enabled.get()
+    if use_cache:
+        for candidate in router.candidates(tier):
+            cached = await response_cache.aget(response_key(prompt, inputs, output, candidate.model_name))
+            if cached is not None:
+                return _decode_response(cached)
+
+    async with llm_slot(tier) as backend:
+        chain = prompt | backend.bind(output, _OUTPUTS[output])
+        result = await asyncio.wait_for(chain.ainvoke(inputs), timeout or LLM_TIMEOUT_SECONDS)
+    if postprocess is not None:
+        result = postprocess(result)
+
+    if use_cache:
+        encoded = _encode_response(result)
+        if encoded is not None:
+            await response_cache.aset(response_key(prompt, inputs, output, backend.model_name), encoded)
+    return result
+
+
+async def astream(prompt: BasePromptTemplate, inputs: Dict[str, Any], tier: str = LARGE,
+                  timeout: Optional[float] = None) -> AsyncIterator[Any]:
+    """Stream text chunks; ``timeout`` bounds the whole stream, not each chunk."""
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + (timeout or LLM_TIMEOUT_SECONDS)
+    async with llm_slot(tier) as backend:
+        stream = (prompt | backend.chat_model).astream(inputs)
+        try:
+            chunks = stream.__aiter__()
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(chunks.__anext__(), max(0.0, deadline - loop.time()))
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        finally:
+            aclose = getattr(stream, "aclose", None)
+            if aclose is not None:
+                await aclose()
+
+
+def stats() -> Dict[str, Any]:
+    return {
+        "max_concurrency": LLM_CONCURRENCY,
+        "in_flight": _in_flight,
+        "waiting": _waiting,
+        "max_waiting": LLM_MAX_WAITING,
+        "shed": _shed,
+        "backends": router.stats(),
+        "response_cache": response_cache.stats() if response_cache is not None else None,
+    }
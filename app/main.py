@@ -1,13 +1,46 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+from .admission import LLMUnavailableError
+from .http_client import close_http_client, start_http_client
+from .jobs import job_queue
+from .routers.quiz import quiz_pool, router as quiz_router
+from .store import quiz_store, retention_sweeper
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await start_http_client()
+    await job_queue.start()
+    await retention_sweeper.start()
+    await quiz_pool.start()
+    try:
+        yield
+    finally:
+        await quiz_pool.stop()
+        await retention_sweeper.stop()
+        await job_queue.stop()
+        await close_http_client()
+        quiz_store.flush()
 
-from .routers.quiz import router as quiz_router
 
 app = FastAPI(
     title="Quiz Generation Microservice",
     description="A microservice for generating and evaluating quizzes using AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
 )
 
+
+
+@app.exception_handler(LLMUnavailableError)
+async def llm_unavailable_handler(request: Request, exc: LLMUnavailableError):
+    """Shed load with 429/503 and Retry-After instead of failing with a 500."""
+    return JSONResponse(status_code=exc.status_code, content={"detail": str(exc)}, headers=exc.headers())
+
+
 app.include_router(quiz_router)
 
 
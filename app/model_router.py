@@ -0,0 +1,134 @@
+"""Routing of LLM calls across configured backends by rolling latency and error rate."""
+
+import statistics
+import time
+from collections import deque
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from .admission import OPEN, CircuitBreaker, TokenBucket
+
+# Quality tier for quiz generation, and a cheaper, faster tier for steps like research summaries
+LARGE = "large"
+SMALL = "small"
+TIERS = (LARGE, SMALL)
+
+
+class Backend:
+    """One chat model with its own quota, circuit breaker and rolling call stats.
+
+    Only calls made within the last ``window_seconds`` count, so a backend that
+    was avoided for its errors becomes unmeasured again and gets retried.
+    """
+
+    def __init__(self, name: str, model_name: str, chat_model: Any, tiers: FrozenSet[str],
+                 rate_limiter: TokenBucket, breaker: CircuitBreaker, window_seconds: float):
+        self.name = name
+        self.model_name = model_name
+        self.chat_model = chat_model
+        self.tiers = tiers
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.window_seconds = window_seconds
+        # (finished_at, latency or None for a failure)
+        self._calls: Deque[Tuple[float, Optional[float]]] = deque(maxlen=256)
+        self._bound: Dict[str, Any] = {}
+        self.calls = 0
+        self.failures = 0
+
+    def bind(self, output: str, build) -> Any:
+        """Return ``build(chat_model)``, built once per output type."""
+        if output not in self._bound:
+            self._bound[output] = build(self.chat_model)
+        return self._bound[output]
+
+    def _recent(self) -> List[Tuple[float, Optional[float]]]:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._calls and self._calls[0][0] < cutoff:
+            self._calls.popleft()
+        return list(self._calls)
+
+    def record_success(self, latency: float) -> None:
+        self.calls += 1
+        self._calls.append((time.monotonic(), latency))
+        self.breaker.record_success()
+
+    def record_failure(self) -> None:
+        self.calls += 1
+        self.failures += 1
+        self._calls.append((time.monotonic(), None))
+        self.breaker.record_failure()
+
+    def latency(self) -> Optional[float]:
+        """Median latency of recent successful calls, None when unmeasured."""
+        latencies = [latency for _, latency in self._recent() if latency is not None]
+        return statistics.median(latencies) if latencies else None
+
+    def error_rate(self) -> float:
+        recent = self._recent()
+        return sum(1 for _, latency in recent if latency is None) / len(recent) if recent else 0.0
+
+    def sample_count(self) -> int:
+        return len(self._recent())
+
+    def stats(self) -> Dict[str, Any]:
+        latency = self.latency()
+        return {
+            "name": self.name,
+            "model": self.model_name,
+            "tiers": sorted(self.tiers),
+            "calls": self.calls,
+            "failures": self.failures,
+            "recent_calls": self.sample_count(),
+            "latency_seconds": round(latency, 3) if latency is not None else None,
+            "error_rate": round(self.error_rate(), 3),
+            "rate_limiter": self.rate_limiter.stats(),
+            "circuit_breaker": self.breaker.stats(),
+        }
+
+
+class ModelRouter:
+    """Orders backends for a call: the fastest healthy backend of the tier first.
+
+    A backend is unhealthy while its circuit breaker is open or, once it has
+    ``min_samples`` recent calls, while its error rate exceeds ``max_error_rate``.
+    Unmeasured backends sort first so they get probed. Small-tier calls fall back
+    to large-tier backends; large-tier calls only use small ones if no backend
+    serves the large tier at all.
+    """
+
+    def __init__(self, backends: List[Backend], max_error_rate: float, min_samples: int):
+        if not backends:
+            raise ValueError("At least one LLM backend must be configured")
+        self.backends = backends
+        self.max_error_rate = max_error_rate
+        self.min_samples = min_samples
+        self.routed: Dict[str, int] = {backend.name: 0 for backend in backends}
+
+    def healthy(self, backend: Backend) -> bool:
+        breaker = backend.breaker
+        if breaker.state == OPEN and time.monotonic() < breaker.opened_at + breaker.reset_seconds:
+            return False
+        return backend.sample_count() < self.min_samples or backend.error_rate() <= self.max_error_rate
+
+    def candidates(self, tier: str) -> List[Backend]:
+        primary = [backend for backend in self.backends if tier in backend.tiers]
+        fallback = [backend for backend in self.backends if tier not in backend.tiers]
+        if primary and tier != SMALL:
+            fallback = []
+
+        def speed(backend: Backend) -> float:
+            latency = backend.latency()
+            return latency if latency is not None else 0.0
+
+        ordered = [b for group in (primary, fallback) for b in sorted(group, key=speed) if self.healthy(b)]
+        unhealthy = [b for b in primary + fallback if b not in ordered]
+        return ordered + sorted(unhealthy, key=lambda b: b.error_rate())
+
+    def record_route(self, backend: Backend) -> None:
+        self.routed[backend.name] += 1
+
+    def stats(self) -> List[Dict[str, Any]]:
+        return [
+            {**backend.stats(), "healthy": self.healthy(backend), "routed": self.routed[backend.name]}
+            for backend in self.backends
+        ]
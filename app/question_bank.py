@@ -0,0 +1,154 @@
+"""Bank of previously generated questions with near-duplicate detection."""
+
+import asyncio
+import logging
+import os
+import random
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .cache import normalize_key_part
+from .fingerprint import hamming, simhash
+from .schemas import QuizBundle, QuizQuestion
+
+logger = logging.getLogger(__name__)
+
+QUESTION_BANK_MAX_PER_BUCKET = int(os.getenv("QUESTION_BANK_MAX_PER_BUCKET", "500"))
+QUESTION_BANK_DEDUP_DISTANCE = int(os.getenv("QUESTION_BANK_DEDUP_DISTANCE", "3"))
+QUESTION_BANK_WARM_QUIZZES = int(os.getenv("QUESTION_BANK_WARM_QUIZZES", "50"))
+# Least recently used topic/difficulty buckets are dropped beyond this many
+QUESTION_BANK_MAX_BUCKETS = int(os.getenv("QUESTION_BANK_MAX_BUCKETS", "256"))
+
+_BANDS = 4
+_BAND_BITS = 64 // _BANDS
+_BAND_MASK = (1 << _BAND_BITS) - 1
+
+
+class _Bucket:
+    """Questions of one topic/difficulty with a banded index over their fingerprints.
+
+    With ``_BANDS`` bands and a max distance below ``_BANDS``, any near duplicate
+    shares at least one band exactly, so only those candidates are compared.
+    """
+
+    def __init__(self):
+        self.questions: List[Tuple[int, QuizQuestion]] = []
+        self.bands: List[Dict[int, List[int]]] = [{} for _ in range(_BANDS)]
+        self.warming: Optional[asyncio.Future] = None
+
+    def find(self, fingerprint: int, max_distance: int) -> bool:
+        for band, index in enumerate(self.bands):
+            for other in index.get(fingerprint >> (band * _BAND_BITS) & _BAND_MASK, ()):
+                if hamming(fingerprint, other) <= max_distance:
+                    return True
+        return False
+
+    def add(self, fingerprint: int, question: QuizQuestion) -> None:
+        self.questions.append((fingerprint, question))
+        for band, index in enumerate(self.bands):
+            index.setdefault(fingerprint >> (band * _BAND_BITS) & _BAND_MASK, []).append(fingerprint)
+
+    def rebuild(self, questions: List[Tuple[int, QuizQuestion]]) -> None:
+        self.questions = []
+        self.bands = [{} for _ in range(_BANDS)]
+        for fingerprint, question in questions:
+            self.add(fingerprint, question)
+
+
+class QuestionBank:
+    """Stores generated questions per (topic, difficulty) and drops near duplicates.
+
+    Buckets are filled from every stored quiz and kept in LRU order, at most
+    ``max_buckets`` of them. ``warm`` loads a bucket once from the most recent
+    quizzes in the quiz store, so the bank survives restarts and evictions;
+    callers await it before using the bucket.
+    """
+
+    def __init__(self, max_per_bucket: int = QUESTION_BANK_MAX_PER_BUCKET,
+                 max_distance: int = QUESTION_BANK_DEDUP_DISTANCE,
+                 loader: Optional[Callable[[str], List[QuizBundle]]] = None,
+                 max_buckets: int = QUESTION_BANK_MAX_BUCKETS):
+        self.max_per_bucket = max_per_bucket
+        self.max_distance = min(max_distance, _BANDS - 1)
+        self.loader = loader
+        self.max_buckets = max_buckets
+        self._buckets: "OrderedDict[Tuple[str, str], _Bucket]" = OrderedDict()
+        self.evicted_buckets = 0
+        self.added = 0
+        self.duplicates = 0
+        self.served = 0
+
+    def _bucket(self, topic: str, difficulty: str) -> _Bucket:
+        key = (normalize_key_part(topic), normalize_key_part(difficulty))
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = _Bucket()
+            while len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+                self.evicted_buckets += 1
+        self._buckets.move_to_end(key)
+        return bucket
+
+    async def warm(self, topic: str, difficulty: str) -> None:
+        """Load the bucket from the quiz store once; the blocking load runs in an executor."""
+        bucket = self._bucket(topic, difficulty)
+        if self.loader is None:
+            return
+        if bucket.warming is None:
+            bucket.warming = asyncio.ensure_future(self._warm(bucket, topic, normalize_key_part(difficulty)))
+        # Shared by concurrent callers, so one being cancelled must not cancel the load
+        await asyncio.shield(bucket.warming)
+
+    async def _warm(self, bucket: _Bucket, topic: str, difficulty_key: str) -> None:
+        try:
+            bundles = await asyncio.get_event_loop().run_in_executor(None, self.loader, topic)
+        except Exception as e:
+            logger.error(f"Failed to warm question bank for '{topic}': {e}")
+            return
+        for bundle in bundles:
+            if normalize_key_part(bundle.difficulty) == difficulty_key:
+                self._add_questions(bucket, bundle.questions)
+
+    def _add_questions(self, bucket: _Bucket, questions: List[QuizQuestion]) -> List[QuizQuestion]:
+        added = []
+        for question in questions:
+            if not question.correct_answer:
+                continue
+            fingerprint = simhash(question.questionText)
+            if bucket.find(fingerprint, self.max_distance):
+                self.duplicates += 1
+                continue
+            bucket.add(fingerprint, question)
+            added.append(question)
+        self.added += len(added)
+        overflow = len(bucket.questions) - self.max_per_bucket
+        if overflow > 0:
+            bucket.rebuild(bucket.questions[overflow:])
+        return added
+
+    def add(self, topic: str, difficulty: str, questions: List[QuizQuestion]) -> List[QuizQuestion]:
+        """Bank ``questions``; returns the ones that were not near duplicates."""
+        return self._add_questions(self._bucket(topic, difficulty), questions)
+
+    def add_bundle(self, bundle: QuizBundle) -> None:
+        self.add(bundle.topic, bundle.difficulty, bundle.questions)
+
+    def sample(self, topic: str, difficulty: str, count: int) -> List[QuizQuestion]:
+        """Pick up to ``count`` random banked questions, renumbered from 1."""
+        questions = self._bucket(topic, difficulty).questions
+        picked = random.sample(questions, min(count, len(questions)))
+        self.served += len(picked)
+        return [q.model_copy(update={"questionId": i + 1}) for i, (_, q) in enumerate(picked)]
+
+    def size(self, topic: str, difficulty: str) -> int:
+        return len(self._bucket(topic, difficulty).questions)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "buckets": len(self._buckets),
+            "evicted_buckets": self.evicted_buckets,
+            "questions": sum(len(b.questions) for b in self._buckets.values()),
+            "added": self.added,
+            "duplicates_dropped": self.duplicates,
+            "served": self.served,
+        }
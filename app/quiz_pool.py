@@ -0,0 +1,128 @@
+"""Pool of pre-generated quizzes for predictable, popular requests."""
+
+import asyncio
+import logging
+import os
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from .cache import normalize_key_part
+from .schemas import QuizBundleLLM
+
+logger = logging.getLogger(__name__)
+
+# Buckets as "topic|difficulty|num_questions" separated by ";", e.g. "Ancient Rome|medium|5"
+QUIZ_POOL_BUCKETS = os.getenv("QUIZ_POOL_BUCKETS", "")
+QUIZ_POOL_SIZE = int(os.getenv("QUIZ_POOL_SIZE", "3"))
+QUIZ_POOL_REFILL_CONCURRENCY = int(os.getenv("QUIZ_POOL_REFILL_CONCURRENCY", "1"))
+QUIZ_POOL_RETRY_SECONDS = float(os.getenv("QUIZ_POOL_RETRY_SECONDS", "30"))
+
+
+class PoolBucket(NamedTuple):
+    topic: str
+    difficulty: str
+    num_questions: int
+
+
+def parse_pool_buckets(spec: str) -> List[PoolBucket]:
+    buckets = []
+    for item in spec.split(";"):
+        if not item.strip():
+            continue
+        try:
+            topic, difficulty, num_questions = (part.strip() for part in item.split("|"))
+            buckets.append(PoolBucket(topic, difficulty, int(num_questions)))
+        except ValueError:
+            logger.error(f"Ignoring malformed quiz pool bucket: {item!r}")
+    return buckets
+
+
+def bucket_key(topic: str, difficulty: str, num_questions: int) -> Tuple[str, str, int]:
+    return normalize_key_part(topic), normalize_key_part(difficulty), num_questions
+
+
+class QuizPool:
+    """Keeps up to ``size`` ready quizzes per configured bucket.
+
+    Taking a quiz schedules a background refill of its bucket; at most one refill
+    task runs per bucket and ``refill_concurrency`` bounds generation across buckets.
+    """
+
+    def __init__(self, buckets: List[PoolBucket], size: int,
+                 fill: Callable[[PoolBucket], Awaitable[QuizBundleLLM]],
+                 refill_concurrency: int = QUIZ_POOL_REFILL_CONCURRENCY,
+                 retry_seconds: float = QUIZ_POOL_RETRY_SECONDS):
+        self.size = size
+        self.fill = fill
+        self.refill_concurrency = refill_concurrency
+        self.retry_seconds = retry_seconds
+        self._buckets = {bucket_key(*bucket): bucket for bucket in buckets}
+        self._ready: Dict[Tuple[str, str, int], Deque[QuizBundleLLM]] = {key: deque() for key in self._buckets}
+        self._refills: Dict[Tuple[str, str, int], asyncio.Task] = {}
+        # Created lazily so it binds to the running event loop
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.hits = 0
+        self.misses = 0
+        self.generated = 0
+        self.failures = 0
+
+    async def start(self) -> None:
+        for key in self._buckets:
+            self._schedule(key)
+
+    async def stop(self) -> None:
+        tasks = list(self._refills.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refills.clear()
+
+    def take(self, topic: str, difficulty: str, num_questions: int) -> Optional[QuizBundleLLM]:
+        """Pop a ready quiz for the bucket, or None if the bucket is not pooled or empty."""
+        key = bucket_key(topic, difficulty, num_questions)
+        ready = self._ready.get(key)
+        if ready is None:
+            return None
+        bundle = ready.popleft() if ready else None
+        if bundle is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+        self._schedule(key)
+        return bundle
+
+    def _schedule(self, key: Tuple[str, str, int]) -> None:
+        task = self._refills.get(key)
+        if task is None or task.done():
+            self._refills[key] = asyncio.ensure_future(self._refill(key))
+
+    async def _refill(self, key: Tuple[str, str, int]) -> None:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.refill_concurrency)
+        bucket = self._buckets[key]
+        ready = self._ready[key]
+        while len(ready) < self.size:
+            try:
+                async with self._semaphore:
+                    bundle = await self.fill(bucket)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Quiz pool refill failed for {bucket}: {e}")
+                await asyncio.sleep(self.retry_seconds)
+                continue
+            ready.append(bundle)
+            self.generated += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "target_depth": self.size,
+            "buckets": [
+                {**bucket._asdict(), "depth": len(self._ready[key])}
+                for key, bucket in self._buckets.items()
+            ],
+            "refilling": sum(1 for task in self._refills.values() if not task.done()),
+            "hits": self.hits,
+            "misses": self.misses,
+            "generated": self.generated,
+            "failures": self.failures,
+        }
@@ -0,0 +1,100 @@
+"""Validation, salvage and repair guidance for LLM-generated quiz questions."""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from .schemas import QuizBundleLLM, QuizQuestion
+
+logger = logging.getLogger(__name__)
+
+MIN_OPTIONS = 2
+
+repair_stats = {"salvaged_bundles": 0, "fixed_locally": 0, "dropped": 0, "repair_calls": 0, "repaired_questions": 0}
+
+
+def validate_question(question: QuizQuestion) -> Optional[QuizQuestion]:
+    """Return the question if it is gradable, fixed up where possible, else None.
+
+    A question needs text, at least two non-empty options and exactly one
+    correct answer whose key is one of the options. A correct answer given by
+    option text instead of key is mapped back to its key.
+    """
+    options = {key.strip(): text for key, text in question.options.items() if key.strip() and str(text).strip()}
+    if not question.questionText.strip() or len(options) < MIN_OPTIONS:
+        repair_stats["dropped"] += 1
+        return None
+
+    by_text = {text.strip().lower(): key for key, text in options.items()}
+    correct: Optional[str] = None
+    for key, text in question.correct_answer.items():
+        key = key.strip()
+        if key in options:
+            correct = key
+        elif key.upper() in options:
+            correct = key.upper()
+        else:
+            correct = by_text.get(str(text).strip().lower()) or by_text.get(key.lower())
+        if correct is not None:
+            break
+    if correct is None:
+        repair_stats["dropped"] += 1
+        return None
+
+    fixed = {"options": options, "correct_answer": {correct: options[correct]}}
+    if fixed["options"] != question.options or fixed["correct_answer"] != question.correct_answer:
+        repair_stats["fixed_locally"] += 1
+        return question.model_copy(update=fixed)
+    return question
+
+
+def salvage_bundle(result: Dict[str, Any], topic: str, difficulty: str) -> QuizBundleLLM:
+    """Turn ``with_structured_output(..., include_raw=True)`` output into a bundle.
+
+    When the bundle as a whole failed to parse, every question in the raw model
+    output that validates on its own is kept.
+    """
+    if result.get("parsed") is not None:
+        return result["parsed"]
+
+    raw = result.get("raw")
+    args: Any = None
+    tool_calls = getattr(raw, "tool_calls", None) or []
+    if tool_calls:
+        args = tool_calls[0].get("args")
+    elif raw is not None:
+        try:
+            args = json.loads(raw.content)
+        except (TypeError, ValueError):
+            args = None
+    items = args.get("questions") if isinstance(args, dict) else None
+
+    questions: List[QuizQuestion] = []
+    for item in items if isinstance(items, list) else []:
+        try:
+            questions.append(QuizQuestion.model_validate(item))
+        except ValidationError:
+            repair_stats["dropped"] += 1
+    if not questions:
+        error = result.get("parsing_error")
+        raise error if isinstance(error, Exception) else ValueError("No questions generated by LLM")
+
+    repair_stats["salvaged_bundles"] += 1
+    logger.warning(f"Salvaged {len(questions)} questions from an invalid LLM bundle: {result.get('parsing_error')}")
+    return QuizBundleLLM(
+        topic=args.get("topic") or topic,
+        difficulty=args.get("difficulty") or difficulty,
+        questions=questions,
+    )
+
+
+def repair_guidance(existing: List[QuizQuestion], first_id: int) -> str:
+    """Prompt addition asking only for replacement questions that differ from ``existing``."""
+    listed = "\n".join(f"  - {q.questionText}" for q in existing)
+    return (
+        f"- Number questions from {first_id}. Each question needs options A-D and exactly one "
+        f"correct_answer whose key is one of the options\n"
+        f"- These questions already exist, do not repeat them:\n{listed}\n"
+    )
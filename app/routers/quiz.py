@@ -1,32 +1,51 @@
 from uuid import UUID, uuid4
-from typing import List, Dict, Optional
-from fastapi import APIRouter, HTTPException
+from typing import AsyncIterator, Awaitable, Callable, List, Dict, NamedTuple, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from langchain_core.prompts import PromptTemplate
 from langchain_core.output_parsers import PydanticOutputParser
-from langchain_groq import ChatGroq
+from pydantic import ValidationError
 from datetime import datetime
 from dotenv import load_dotenv
 import asyncio
+import os
 from duckduckgo_search import DDGS
-import requests
-from bs4 import BeautifulSoup
 import re
 import logging
 
 load_dotenv()
 
+from ..admission import LLMUnavailableError
+from ..cache import PageCache, create_cache, normalize_key_part
+from ..context_packer import QUIZ_CONTEXT_TOKENS, count_tokens, pack_lines, pack_sources, pack_text
+from ..extraction import PageTextExtractor, is_html_content_type
+from ..http_client import get_http_client, host_slot
+from .. import llm as llm_client
+from ..grading import AnswerKey, NoGradableAnswersError, grade_sheets, grade_submission
+from ..quiz_pool import QUIZ_POOL_BUCKETS, QUIZ_POOL_SIZE, PoolBucket, QuizPool, parse_pool_buckets
+from ..question_bank import QUESTION_BANK_WARM_QUIZZES, QuestionBank
+from ..jobs import COMPLETED, FAILED, PENDING, QueueFullError, QuizJob, job_queue
+from ..repair import repair_guidance, repair_stats, salvage_bundle, validate_question
+from ..singleflight import SingleFlight
+from ..summarizer import summarize
+from ..store import JobStatus, quiz_store
+from ..streaming import NDJSON_MEDIA_TYPE, QuestionStreamParser, ndjson_event
 from ..schemas import (
     GenerateQuizRequest,
     GenerateQuizResponse,
     QuizDetailResponse,
     SubmitQuizRequest,
     SubmitQuizResponse,
-    QuestionResult,
+    BulkSubmitRequest,
+    BulkSubmitResponse,
     QuizQuestion,
     QuizBundle,
     QuizBundleLLM,
     AgenticQuizRequest,
     AgenticQuizResponse,
+    BatchQuizRequest,
+    BatchQuizItem,
+    BatchQuizResponse,
     TopicResearch,
     ResearchInfo,
 )
@@ -37,6 +56,70 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/api/quiz", tags=["quiz"])
 
+# ---- Research settings ----
+FETCH_CONCURRENCY = int(os.getenv("FETCH_CONCURRENCY", "5"))
+FETCH_DEADLINE_SECONDS = float(os.getenv("FETCH_DEADLINE_SECONDS", "12"))
+FETCH_MIN_GOOD_PAGES = int(os.getenv("FETCH_MIN_GOOD_PAGES", "3"))
+MAX_PAGE_BYTES = int(os.getenv("MAX_PAGE_BYTES", str(512 * 1024)))
+PAGE_TEXT_LIMIT = 2000
+
+# ---- Research depth ----
+class ResearchProfile(NamedTuple):
+    """Cost/latency profile of one ``research_depth``."""
+    queries: Tuple[str, ...]  # Search query templates, formatted with the topic
+    max_results: int
+    scrape: bool  # Fetch result pages, or use search snippets only
+    min_good_pages: int
+    stage_deadline: float  # Deadline for each of the search and page fetch stages
+    budget: float  # Overall seconds for search, fetching and summarization
+
+RESEARCH_PROFILES = {
+    "basic": ResearchProfile(
+        ("{topic}",), 3, False, 0, 5.0,
+        float(os.getenv("RESEARCH_BASIC_BUDGET_SECONDS", "20")),
+    ),
+    "comprehensive": ResearchProfile(
+        ("{topic}",), 5, True, FETCH_MIN_GOOD_PAGES, FETCH_DEADLINE_SECONDS,
+        float(os.getenv("RESEARCH_COMPREHENSIVE_BUDGET_SECONDS", "60")),
+    ),
+    "expert": ResearchProfile(
+        ("{topic}", "{topic} key facts and history", "{topic} explained in depth"),
+        10, True, 8, FETCH_DEADLINE_SECONDS * 2,
+        float(os.getenv("RESEARCH_EXPERT_BUDGET_SECONDS", "100")),
+    ),
+}
+
+# "llm" summarizes research with an LLM call, "local" with the extractive summarizer
+RESEARCH_SUMMARIZER = os.getenv("RESEARCH_SUMMARIZER", "llm")
+
+def research_profile(research_depth: str) -> Tuple[str, ResearchProfile]:
+    """Resolve a requested depth to its profile name and profile; unknown depths are comprehensive."""
+    depth = normalize_key_part(research_depth)
+    if depth not in RESEARCH_PROFILES:
+        depth = "comprehensive"
+    return depth, RESEARCH_PROFILES[depth]
+
+# ---- Research cache ----
+RESEARCH_CACHE_BACKEND = os.getenv("RESEARCH_CACHE_BACKEND", "memory")
+RESEARCH_CACHE_MAX_ENTRIES = int(os.getenv("RESEARCH_CACHE_MAX_ENTRIES", "256"))
+RESEARCH_CACHE_TTL_SECONDS = float(os.getenv("RESEARCH_CACHE_TTL_SECONDS", "3600"))
+research_cache = create_cache(
+    RESEARCH_CACHE_BACKEND, "research", RESEARCH_CACHE_MAX_ENTRIES, RESEARCH_CACHE_TTL_SECONDS
+)
+
+PAGE_CACHE_MAX_BYTES = int(os.getenv("PAGE_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+PAGE_CACHE_FRESH_SECONDS = float(os.getenv("PAGE_CACHE_FRESH_SECONDS", "600"))
+page_cache = PageCache(PAGE_CACHE_MAX_BYTES, PAGE_CACHE_FRESH_SECONDS) if PAGE_CACHE_MAX_BYTES > 0 else None
+
+# Every generated quiz feeds the bank; it is warmed from stored quizzes on first use
+question_bank = QuestionBank(loader=lambda topic: quiz_store.find_by_topic(topic, QUESTION_BANK_WARM_QUIZZES))
+
+# Ready-made quizzes for popular (topic, difficulty, num_questions) buckets
+quiz_pool = QuizPool(
+    parse_pool_buckets(QUIZ_POOL_BUCKETS), QUIZ_POOL_SIZE,
+    fill=lambda bucket: fill_pool_bucket(bucket)
+)
+
 # ---- LLM Setup ----
 parser = PydanticOutputParser(pydantic_object=QuizBundleLLM)
 
@@ -70,11 +153,12 @@ quiz_generation_prompt = PromptTemplate(
         "- explanation must be 1–2 sentences explaining why the answer is correct\n"
         "- For {difficulty} difficulty: adjust question complexity accordingly\n"
         "- Questions should test understanding, not just memorization\n"
-        "- All questions must be factually accurate based on the research\n\n"
+        "- All questions must be factually accurate based on the research\n"
+        "{chunk_guidance}\n"
         "Return JSON that matches this schema:\n{format_instructions}"
     ),
     input_variables=["topic", "num_questions", "difficulty", "research_summary", "key_concepts", "difficulty_facts"],
-    partial_variables={"format_instructions": parser.get_format_instructions()},
+    partial_variables={"format_instructions": parser.get_format_instructions(), "chunk_guidance": ""},
 )
 
 # Fallback prompt for when research fails
@@ -87,55 +171,86 @@ fallback_quiz_prompt = PromptTemplate(
         "- correct_answer must be a single-key object like {{\"B\": \"Augustus\"}}\n"
         "- explanation must be 1–2 sentences explaining why the answer is correct\n"
         "- For {difficulty} difficulty: adjust question complexity accordingly\n"
-        "- Questions should test understanding, not just memorization\n\n"
+        "- Questions should test understanding, not just memorization\n"
+        "{chunk_guidance}\n"
         "Return JSON that matches this schema:\n{format_instructions}"
     ),
     input_variables=["topic", "num_questions", "difficulty"],
-    partial_variables={"format_instructions": parser.get_format_instructions()},
+    partial_variables={"format_instructions": parser.get_format_instructions(), "chunk_guidance": ""},
 )
 
-llm = ChatGroq(model="deepseek-r1-distill-llama-70b", temperature=0)
-structured_llm = llm.with_structured_output(QuizBundleLLM)
+# Large quizzes are generated as parallel chunks of at most this many questions
+QUIZ_CHUNK_SIZE = int(os.getenv("QUIZ_CHUNK_SIZE", "10"))
+
+# Upper bound for long-polling GET /{quiz_id}?wait=...
+LONG_POLL_MAX_SECONDS = float(os.getenv("LONG_POLL_MAX_SECONDS", "30"))
+LONG_POLL_INTERVAL_SECONDS = 0.25
+
+# Overall deadline of an agentic quiz, and how long research may run before
+# generation without research is started alongside it (0 disables hedging)
+AGENTIC_DEADLINE_SECONDS = float(os.getenv("AGENTIC_DEADLINE_SECONDS", "150"))
+HEDGE_AFTER_SECONDS = float(os.getenv("HEDGE_AFTER_SECONDS", "20"))
+hedge_stats = {"hedged": 0, "fallback_wins": 0, "deadline_exceeded": 0}
+
+# Coalesce concurrent identical research and generation work
+research_flight = SingleFlight()
+generation_flight = SingleFlight()
 
-# ---- In-memory store ----
-QUIZ_DB: Dict[UUID, QuizBundle] = {}
-RESEARCH_DB: Dict[UUID, TopicResearch] = {}
+# ---- Quiz store ----
+def record_job_status(job: QuizJob) -> None:
+    """Publish job status through the shared store so every worker can report it."""
+    quiz_store.put_status(job.quiz_id, JobStatus(job.topic, job.difficulty, job.status, job.error))
+
+job_queue.status_listener = record_job_status
 
 # ---- Web Research Functions ----
-async def search_web(topic: str, max_results: int = 5) -> List[ResearchInfo]:
-    """Search the web for information about a topic using DuckDuckGo."""
+async def search_web(
+    topic: str,
+    max_results: int = 5,
+    max_concurrency: int = FETCH_CONCURRENCY,
+    deadline: float = FETCH_DEADLINE_SECONDS,
+    min_good_pages: int = FETCH_MIN_GOOD_PAGES,
+    queries: Optional[List[str]] = None,
+    scrape: bool = True,
+) -> List[ResearchInfo]:
+    """Search the web for information about a topic using DuckDuckGo.
+
+    Result pages are fetched concurrently (at most ``max_concurrency`` at a time)
+    and the fetch stage stops as soon as ``min_good_pages`` pages have yielded
+    content or ``deadline`` seconds have elapsed; outstanding fetches are cancelled.
+    Several ``queries`` are searched in parallel and their results merged; with
+    ``scrape=False`` the search snippets are used instead of fetching pages.
+    """
     try:
-        # Run the blocking DDGS operation in a thread pool
+        # Run the blocking DDGS operations in a thread pool
         loop = asyncio.get_event_loop()
-        search_results = await loop.run_in_executor(
-            None, 
-            lambda: list(DDGS().text(topic, max_results=max_results))
+        searches = [
+            loop.run_in_executor(None, lambda query=query: list(DDGS().text(query, max_results=max_results)))
+            for query in queries or [topic]
+        ]
+        search_results = merge_search_results(
+            await asyncio.wait_for(asyncio.gather(*searches), deadline)
         )
         
-        research_info = []
-        
-        # Process results concurrently
-        tasks = []
-        for result in search_results:
-            task = extract_webpage_content(result.get('href', result.get('link', '')))
-            tasks.append((result, task))
+        if not scrape:
+            research_info = [
+                ResearchInfo(
+                    source=result.get('href', ''),
+                    content=result.get('body', '')[:1500],
+                    relevance_score=calculate_relevance(result.get('title', ''), topic)
+                )
+                for result in search_results if result.get('body')
+            ]
+            research_info.sort(key=lambda x: x.relevance_score, reverse=True)
+            return research_info[:max_results]
         
-        # Wait for all content extraction tasks
-        for result, task in tasks:
-            try:
-                content = await task
-                if content:
-                    # Calculate relevance score based on title match
-                    title = result.get('title', '')
-                    title_relevance = calculate_relevance(title, topic)
-                    research_info.append(ResearchInfo(
-                        source=result.get('href', result.get('link', '')),
-                        content=content[:1500],  # Increased content length
-                        relevance_score=title_relevance
-                    ))
-            except Exception as e:
-                logger.warning(f"Error processing result {result.get('link', 'unknown')}: {e}")
-                continue
+        research_info = await fetch_research_pages(
+            search_results,
+            topic,
+            max_concurrency=max_concurrency,
+            deadline=deadline,
+            min_good_pages=min(min_good_pages, max_results) if min_good_pages > 0 else max_results,
+        )
         
         # Sort by relevance and return top results
         research_info.sort(key=lambda x: x.relevance_score, reverse=True)
@@ -145,45 +260,127 @@ async def search_web(topic: str, max_results: int = 5) -> List[ResearchInfo]:
         logger.error(f"Error in web search: {e}")
         return []
 
+def merge_search_results(result_lists: List[List[Dict]]) -> List[Dict]:
+    """Interleave results of several queries, dropping repeated URLs."""
+    seen = set()
+    merged: List[Dict] = []
+    for rank in range(max((len(results) for results in result_lists), default=0)):
+        for results in result_lists:
+            if rank < len(results):
+                url = results[rank].get('href', results[rank].get('link', ''))
+                if url not in seen:
+                    seen.add(url)
+                    merged.append(results[rank])
+    return merged
+
+async def fetch_research_pages(
+    search_results: List[Dict],
+    topic: str,
+    max_concurrency: int,
+    deadline: float,
+    min_good_pages: int,
+) -> List[ResearchInfo]:
+    """Fetch search result pages concurrently with a bounded fan-out."""
+    semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+    async def fetch(result: Dict) -> Optional[ResearchInfo]:
+        url = result.get('href', result.get('link', ''))
+        async with semaphore:
+            content = await extract_webpage_content(url)
+        if not content:
+            return None
+        # Calculate relevance score based on title match
+        return ResearchInfo(
+            source=url,
+            content=content[:1500],  # Increased content length
+            relevance_score=calculate_relevance(result.get('title', ''), topic)
+        )
+
+    tasks = {asyncio.ensure_future(fetch(result)): result for result in search_results}
+    research_info: List[ResearchInfo] = []
+    if not tasks:
+        return research_info
+
+    loop = asyncio.get_event_loop()
+    end_time = loop.time() + deadline
+    pending = set(tasks)
+    try:
+        while pending and len(research_info) < min_good_pages:
+            remaining = end_time - loop.time()
+            if remaining <= 0:
+                logger.warning(f"Page fetch deadline reached with {len(pending)} pages outstanding")
+                break
+            done, pending = await asyncio.wait(
+                pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                try:
+                    info = task.result()
+                except Exception as e:
+                    logger.warning(f"Error processing result {tasks[task].get('href', 'unknown')}: {e}")
+                    continue
+                if info:
+                    research_info.append(info)
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    return research_info
+
 async def extract_webpage_content(url: str) -> str:
-    """Extract text content from a webpage."""
+    """Extract main-content text from a webpage.
+
+    The body is streamed and parsed incrementally: non-HTML responses are skipped
+    from their headers, at most ``MAX_PAGE_BYTES`` are read, and the download stops
+    once ``PAGE_TEXT_LIMIT`` characters of main content have been collected.
+    Extracted text is kept in the shared page cache and revalidated with
+    conditional requests once it goes stale.
+    """
     if not url:
         return ""
         
-    try:
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        }
-        
-        # Run the blocking request in a thread pool
-        loop = asyncio.get_event_loop()
-        response = await loop.run_in_executor(
-            None,
-            lambda: requests.get(url, headers=headers, timeout=10)
-        )
-        response.raise_for_status()
+    cached = page_cache.lookup(url) if page_cache is not None else None
+    if cached is not None and page_cache.is_fresh(cached):
+        return page_cache.text(cached)
         
-        soup = BeautifulSoup(response.content, 'html.parser')
+    # Revalidate stale entries instead of downloading and parsing them again
+    headers = {}
+    if cached is not None:
+        if cached.etag:
+            headers["If-None-Match"] = cached.etag
+        if cached.last_modified:
+            headers["If-Modified-Since"] = cached.last_modified
         
-        # Remove script and style elements
-        for script in soup(["script", "style", "nav", "footer", "header"]):
-            script.decompose()
-        
-        # Focus on main content areas
-        main_content = soup.find('main') or soup.find('article') or soup.find('div', class_=re.compile(r'content|main'))
-        if main_content:
-            text = main_content.get_text()
-        else:
-            text = soup.get_text()
-        
-        # Clean up whitespace
-        lines = (line.strip() for line in text.splitlines())
-        chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-        text = ' '.join(chunk for chunk in chunks if chunk)
+    try:
+        # Reuse pooled keep-alive connections from the shared client
+        async with host_slot(url):
+            async with get_http_client().stream("GET", url, headers=headers) as response:
+                if response.status_code == 304 and cached is not None:
+                    text = page_cache.revalidated(url)
+                    if text is not None:
+                        return text
+                response.raise_for_status()
+                
+                content_type = response.headers.get("content-type")
+                if not is_html_content_type(content_type):
+                    logger.info(f"Skipping non-HTML content ({content_type}) from {url}")
+                    return ""
+                
+                extractor = PageTextExtractor(limit=PAGE_TEXT_LIMIT, encoding=response.charset_encoding)
+                received = 0
+                async for chunk in response.aiter_bytes():
+                    remaining = MAX_PAGE_BYTES - received
+                    received += len(chunk)
+                    if extractor.feed(chunk[:remaining]) or received >= MAX_PAGE_BYTES:
+                        break
+                validators = (response.headers.get("etag"), response.headers.get("last-modified"))
         
-        # Remove extra whitespace and limit length
-        text = re.sub(r'\s+', ' ', text).strip()
-        return text[:2000]  # Reasonable content limit
+        text = extractor.close()
+        if text and page_cache is not None:
+            page_cache.store(url, text, *validators)
+        return text
         
     except Exception as e:
         logger.warning(f"Error extracting content from {url}: {e}")
@@ -210,11 +407,48 @@ def calculate_relevance(title: str, topic: str) -> float:
     # Jaccard similarity
     return intersection / union if union > 0 else 0.0
 
-async def research_topic(topic: str, difficulty: str) -> TopicResearch:
-    """Research a topic using web search and LLM analysis."""
+def research_cache_key(topic: str, difficulty: str, research_depth: str) -> str:
+    """Build the research cache key from normalized topic, difficulty, depth and summarizer."""
+    return "|".join(
+        normalize_key_part(part) for part in (topic, difficulty, research_depth, RESEARCH_SUMMARIZER)
+    )
+
+async def research_topic(topic: str, difficulty: str, research_depth: str = "comprehensive") -> TopicResearch:
+    """Research a topic, reusing cached or in-flight research for repeated topic/difficulty/depth."""
+    research_depth, profile = research_profile(research_depth)
+    cache_key = research_cache_key(topic, difficulty, research_depth)
+    if research_cache is not None:
+        cached = await research_cache.aget(cache_key)
+        if cached is not None:
+            logger.info(f"Research cache hit for '{cache_key}'")
+            return TopicResearch.model_validate(cached)
+    
+    async def run_and_cache() -> TopicResearch:
+        research = await run_topic_research(topic, difficulty, profile)
+        # Only cache research backed by real sources, never the degraded fallbacks
+        if research_cache is not None and research.sources:
+            await research_cache.aset(cache_key, research.model_dump())
+        return research
+    
+    # Concurrent requests for the same research share a single run
+    return await research_flight.do(cache_key, run_and_cache)
+
+async def run_topic_research(
+    topic: str, difficulty: str, profile: ResearchProfile = RESEARCH_PROFILES["comprehensive"]
+) -> TopicResearch:
+    """Research a topic using web search and LLM analysis, within the profile's time budget."""
+    loop = asyncio.get_event_loop()
+    started = loop.time()
     try:
         # Search the web
-        research_data = await search_web(topic, max_results=5)
+        research_data = await search_web(
+            topic,
+            max_results=profile.max_results,
+            deadline=profile.stage_deadline,
+            min_good_pages=profile.min_good_pages,
+            queries=[query.format(topic=topic) for query in profile.queries],
+            scrape=profile.scrape,
+        )
         
         if not research_data:
             logger.warning(f"No research data found for topic: {topic}")
@@ -227,25 +461,30 @@ async def research_topic(topic: str, difficulty: str) -> TopicResearch:
                 sources=[]
             )
         
-        # Combine research data
-        combined_content = "\n\n".join([
-            f"Source: {r.source}\nContent: {r.content}" 
-            for r in research_data if r.content
-        ])
+        # Combine the most relevant research passages within the prompt's token budget
+        combined_content = pack_sources(research_data, topic)
         
         if not combined_content:
             raise ValueError("No valid content extracted from research")
         
+        if RESEARCH_SUMMARIZER == "local":
+            extracted = summarize(topic, difficulty, [r.content for r in research_data if r.content])
+            return TopicResearch(
+                topic=topic,
+                research_summary=extracted.summary or f"Research summary for {topic}",
+                key_concepts=extracted.key_concepts or [topic],
+                difficulty_appropriate_facts=extracted.facts or [f"Facts about {topic}"],
+                sources=research_data
+            )
+        
         # Use LLM to analyze and structure the research
-        research_chain = research_prompt | llm
-        research_response = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: research_chain.invoke({
-                "topic": topic,
-                "difficulty": difficulty,
-                "research_data": combined_content
-            })
-        )
+        # Summarization is a cheap step for the small model tier and gets whatever is left of the research budget
+        remaining = profile.budget - (loop.time() - started)
+        research_response = await llm_client.ainvoke(research_prompt, {
+            "topic": topic,
+            "difficulty": difficulty,
+            "research_data": combined_content
+        }, tier=llm_client.SMALL, timeout=max(1.0, remaining))
         
         # Parse the LLM response to extract structured information
         content = research_response.content
@@ -263,6 +502,9 @@ async def research_topic(topic: str, difficulty: str) -> TopicResearch:
             sources=research_data
         )
         
+    except LLMUnavailableError:
+        # Shedding must reach the client rather than degrade into research without sources
+        raise
     except Exception as e:
         logger.error(f"Error in research_topic: {e}")
         # Return fallback research
@@ -315,156 +557,567 @@ def extract_list_section(content: str, section_name: str, section_header: str) -
     
     return items[:10]  # Limit to reasonable number of items
 
-# ---- Endpoints ----
+# ---- Quiz Generation ----
 
-@router.post("/generate-agentic", response_model=AgenticQuizResponse, status_code=201)
-async def generate_agentic_quiz(payload: AgenticQuizRequest):
+def generation_key(kind: str, topic: str, difficulty: str, num_questions: int, *extra: str) -> Tuple:
+    """Key identifying identical generation work for request coalescing."""
+    return (kind, normalize_key_part(topic), normalize_key_part(difficulty), num_questions) + tuple(
+        normalize_key_part(part) for part in extra
+    )
+
+def create_bundle(quiz_id: UUID, raw_bundle: QuizBundleLLM) -> QuizBundle:
+    """Attach metadata to an LLM bundle (convert to full QuizBundle)."""
+    return QuizBundle(
+        quizId=quiz_id,
+        topic=raw_bundle.topic,
+        difficulty=raw_bundle.difficulty,
+        createdAt=datetime.utcnow().isoformat(),
+        questions=raw_bundle.questions
+    )
+
+async def save_quiz(bundle: QuizBundle) -> None:
+    """Store a freshly generated quiz and add its questions to the question bank."""
+    # Banked first, so warming the bank from the store does not count this quiz twice
+    await question_bank.warm(bundle.topic, bundle.difficulty)
+    question_bank.add_bundle(bundle)
+    quiz_store.put_quiz(bundle)
+
+def chunk_sizes(num_questions: int, chunk_size: int) -> List[int]:
+    """Split ``num_questions`` into near-equal chunks of at most ``chunk_size``."""
+    parts = max(1, -(-num_questions // max(1, chunk_size)))
+    base, extra = divmod(num_questions, parts)
+    return [base + (1 if i < extra else 0) for i in range(parts)]
+
+def chunk_guidance(part: int, parts: int, first_id: int, focus: List[str]) -> str:
+    """Prompt addition steering each chunk towards different questions."""
+    guidance = (
+        f"- This is part {part + 1} of {parts} of a larger quiz: number questions from {first_id} "
+        f"and cover different aspects of the topic than the other parts\n"
+    )
+    focus_items = focus[part::parts]
+    if focus_items:
+        guidance += f"- Focus this part on: {'; '.join(focus_items)}\n"
+    return guidance
+
+def merge_questions(bundles: List[QuizBundleLLM], limit: int) -> List[QuizQuestion]:
+    """Merge chunk results, dropping duplicate questions and renumbering questionIds."""
+    seen = set()
+    merged: List[QuizQuestion] = []
+    for raw_bundle in bundles:
+        for question in raw_bundle.questions:
+            key = normalize_key_part(question.questionText)
+            if key in seen:
+                continue
+            seen.add(key)
+            merged.append(question.model_copy(update={"questionId": len(merged) + 1}))
+    return merged[:limit]
+
+def valid_questions(raw_bundle: QuizBundleLLM) -> QuizBundleLLM:
+    """Keep only gradable questions, with trivially broken answer keys fixed up."""
+    questions = [q for q in map(validate_question, raw_bundle.questions) if q is not None]
+    return raw_bundle.model_copy(update={"questions": questions})
+
+async def repair_questions(
+    prompt: PromptTemplate, inputs: Dict, bundle: QuizBundleLLM, num_questions: int, salvage: Callable[[Dict], QuizBundleLLM]
+) -> QuizBundleLLM:
+    """Ask the LLM only for the questions still missing, keeping the valid ones."""
+    missing = num_questions - len(bundle.questions)
+    repair_stats["repair_calls"] += 1
+    try:
+        extra = await llm_client.ainvoke(prompt, {
+            **inputs,
+            "num_questions": missing,
+            "chunk_guidance": repair_guidance(bundle.questions, len(bundle.questions) + 1),
+        }, output=llm_client.QUIZ_BUNDLE, postprocess=salvage)
+    except Exception as e:
+        logger.warning(f"Repairing {missing} missing quiz questions failed: {e}")
+        return bundle
+    questions = merge_questions([bundle, valid_questions(extra)], num_questions)
+    repair_stats["repaired_questions"] += len(questions) - len(bundle.questions)
+    return bundle.model_copy(update={"questions": questions})
+
+async def generate_chunked(
+    prompt: PromptTemplate,
+    inputs: Dict,
+    num_questions: int,
+    chunk_size: Optional[int] = None,
+    focus: Optional[List[str]] = None,
+) -> QuizBundleLLM:
+    """Generate questions, splitting large quizzes into parallel LLM calls that share one context.
+
+    Invalid questions are dropped and only the shortfall is regenerated in one small repair call.
     """
-    Generate a quiz using agentic approach: research the topic first, then create questions.
+    salvage = lambda result: salvage_bundle(result, inputs["topic"], inputs["difficulty"])
+    sizes = chunk_sizes(num_questions, chunk_size or QUIZ_CHUNK_SIZE)
+    if len(sizes) == 1:
+        calls = [llm_client.ainvoke(prompt, inputs, output=llm_client.QUIZ_BUNDLE, postprocess=salvage)]
+    else:
+        calls = []
+        first_id = 1
+        for part, size in enumerate(sizes):
+            guidance = chunk_guidance(part, len(sizes), first_id, focus or [])
+            calls.append(llm_client.ainvoke(
+                prompt, {**inputs, "num_questions": size, "chunk_guidance": guidance},
+                output=llm_client.QUIZ_BUNDLE, postprocess=salvage
+            ))
+            first_id += size
+    results = await asyncio.gather(*calls, return_exceptions=True)
+    
+    # A failed chunk only loses its own questions
+    bundles = [valid_questions(result) for result in results if isinstance(result, QuizBundleLLM)]
+    errors = [result for result in results if isinstance(result, Exception)]
+    for error in errors:
+        logger.warning(f"Quiz chunk generation failed: {error}")
+    
+    # A shed chunk means the LLM is overloaded; a repair call would only add to the load
+    shed = [error for error in errors if isinstance(error, LLMUnavailableError)]
+    
+    questions = merge_questions(bundles, num_questions)
+    if not questions:
+        raise (shed or errors)[0] if errors else ValueError("No questions generated by LLM")
+    raw_bundle = QuizBundleLLM(
+        topic=bundles[0].topic,
+        difficulty=bundles[0].difficulty,
+        questions=questions
+    )
+    if len(questions) < num_questions and not shed:
+        raw_bundle = await repair_questions(prompt, inputs, raw_bundle, num_questions, salvage)
+    return raw_bundle
+
+async def generate_questions(
+    topic: str, difficulty: str, num_questions: int, chunk_size: Optional[int] = None
+) -> QuizBundleLLM:
+    """Generate quiz questions with the LLM without any research context."""
+    inputs = {"topic": topic, "num_questions": num_questions, "difficulty": difficulty}
+    return await generate_chunked(fallback_quiz_prompt, inputs, num_questions, chunk_size)
+
+async def fill_pool_bucket(bucket: PoolBucket) -> QuizBundleLLM:
+    """Generate a new quiz for the pool; cached responses would make every pooled quiz identical."""
+    with llm_client.fresh_responses():
+        return await generate_questions(bucket.topic, bucket.difficulty, bucket.num_questions)
+
+def research_prompt_inputs(research: TopicResearch, topic: str, difficulty: str, num_questions: int) -> Dict:
+    """Prepare research data for the quiz generation prompt, packed into ``QUIZ_CONTEXT_TOKENS``."""
+    # Half the budget for the summary, a fifth for concepts and whatever is left for facts
+    research_summary = pack_text(research.research_summary, QUIZ_CONTEXT_TOKENS // 2) or f"Information about {topic}"
+    concepts = pack_lines(research.key_concepts, QUIZ_CONTEXT_TOKENS // 5)
+    remaining = QUIZ_CONTEXT_TOKENS - count_tokens(research_summary) - count_tokens("\n".join(concepts))
+    facts = pack_lines(research.difficulty_appropriate_facts, remaining)
+    key_concepts = "\n".join(concepts) if concepts else topic
+    difficulty_facts = "\n".join(facts) if facts else f"Facts about {topic}"
+    return {
+        "topic": topic,
+        "num_questions": num_questions,
+        "difficulty": difficulty,
+        "research_summary": research_summary,
+        "key_concepts": key_concepts,
+        "difficulty_facts": difficulty_facts
+    }
+
+async def generate_questions_from_research(
+    research: TopicResearch, topic: str, difficulty: str, num_questions: int, chunk_size: Optional[int] = None
+) -> QuizBundleLLM:
+    """Generate quiz questions grounded in previously gathered research."""
+    inputs = research_prompt_inputs(research, topic, difficulty, num_questions)
+    return await generate_chunked(
+        quiz_generation_prompt, inputs, num_questions, chunk_size, focus=research.key_concepts
+    )
+
+def fallback_research(topic: str) -> TopicResearch:
+    """Minimal research data for quizzes generated without research."""
+    return TopicResearch(
+        topic=topic,
+        research_summary=f"Quiz generated for {topic}",
+        key_concepts=[topic],
+        difficulty_appropriate_facts=[],
+        sources=[]
+    )
+
+async def generate_agentic_questions(
+    payload: AgenticQuizRequest, get_research: Optional[Callable[[], Awaitable[TopicResearch]]] = None
+) -> Tuple[TopicResearch, QuizBundleLLM]:
+    """Research the topic and generate questions, hedged with generation without research.
+
+    If research is still running after ``HEDGE_AFTER_SECONDS`` (or the research path
+    fails), generation without research starts alongside it; the first valid result
+    wins and the other attempt is cancelled. Both are bounded by ``AGENTIC_DEADLINE_SECONDS``.
+    ``get_research`` supplies research shared with other quizzes instead of researching per request.
     """
-    quiz_id = uuid4()
+    research_done = asyncio.Event()
     
-    try:
+    async def with_research() -> Tuple[TopicResearch, QuizBundleLLM]:
         # Step 1: Research the topic
-        research = await research_topic(payload.topic, payload.difficulty)
-        RESEARCH_DB[quiz_id] = research
+        if get_research is not None:
+            research = await get_research()
+        else:
+            research = await research_topic(payload.topic, payload.difficulty, payload.research_depth)
+        research_done.set()
         
         # Step 2: Generate quiz questions based on research
-        quiz_chain = quiz_generation_prompt | structured_llm
-        
-        # Prepare research data for the prompt
-        research_summary = research.research_summary or f"Information about {payload.topic}"
-        key_concepts = "\n".join(research.key_concepts) if research.key_concepts else payload.topic
-        difficulty_facts = "\n".join(research.difficulty_appropriate_facts) if research.difficulty_appropriate_facts else f"Facts about {payload.topic}"
-        
-        raw_bundle: QuizBundleLLM = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: quiz_chain.invoke({
-                "topic": payload.topic,
-                "num_questions": payload.num_questions,
-                "difficulty": payload.difficulty,
-                "research_summary": research_summary,
-                "key_concepts": key_concepts,
-                "difficulty_facts": difficulty_facts
-            })
+        raw_bundle = await generate_questions_from_research(
+            research, payload.topic, payload.difficulty, payload.num_questions, payload.chunk_size
         )
-        
-        # Step 3: Create quiz bundle with validation
-        if not raw_bundle.questions:
-            raise ValueError("No questions generated by LLM")
-            
-        bundle = QuizBundle(
-            quizId=quiz_id,
-            topic=raw_bundle.topic,
-            difficulty=raw_bundle.difficulty,
-            createdAt=datetime.utcnow().isoformat(),
-            questions=raw_bundle.questions
+        return research, raw_bundle
+    
+    async def without_research() -> Tuple[TopicResearch, QuizBundleLLM]:
+        raw_bundle = await generate_questions(
+            payload.topic, payload.difficulty, payload.num_questions, payload.chunk_size
         )
+        return fallback_research(payload.topic), raw_bundle
+    
+    loop = asyncio.get_event_loop()
+    started = loop.time()
+    deadline = started + AGENTIC_DEADLINE_SECONDS
+    hedge_at = started + HEDGE_AFTER_SECONDS if HEDGE_AFTER_SECONDS > 0 else float("inf")
+    primary = asyncio.ensure_future(with_research())
+    hedge: Optional[asyncio.Future] = None
+    pending = {primary}
+    errors: List[Exception] = []
+    try:
+        while pending:
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                hedge_stats["deadline_exceeded"] += 1
+                raise asyncio.TimeoutError(f"Quiz generation exceeded {AGENTIC_DEADLINE_SECONDS:g}s deadline")
+            if hedge is None and not research_done.is_set():
+                timeout = min(timeout, max(0.0, hedge_at - loop.time()))
+            done, pending = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                try:
+                    result = task.result()
+                except LLMUnavailableError:
+                    # Shed by admission control: hedging would only queue another LLM call
+                    raise
+                except Exception as e:
+                    logger.error(f"Failed to generate agentic quiz{' without research' if task is hedge else ''}: {e}")
+                    errors.append(e)
+                    continue
+                if task is hedge:
+                    hedge_stats["fallback_wins"] += 1
+                return result
+            
+            # Fallback: Generate quiz without research, speculatively or after a failure
+            slow_research = not research_done.is_set() and loop.time() >= hedge_at
+            if hedge is None and (errors or slow_research):
+                if slow_research and not errors:
+                    hedge_stats["hedged"] += 1
+                hedge = asyncio.ensure_future(without_research())
+                pending.add(hedge)
+        raise errors[0]
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
+
+async def build_agentic_quiz(
+    quiz_id: UUID, payload: AgenticQuizRequest,
+    get_research: Optional[Callable[[], Awaitable[TopicResearch]]] = None
+) -> Tuple[QuizBundle, TopicResearch]:
+    """Generate and store an agentic quiz under ``quiz_id``."""
+    # Identical concurrent requests share one research + generation run
+    key = generation_key(
+        "agentic", payload.topic, payload.difficulty, payload.num_questions,
+        payload.research_depth, str(payload.chunk_size or QUIZ_CHUNK_SIZE)
+    )
+    research, raw_bundle = await generation_flight.do(
+        key, lambda: generate_agentic_questions(payload, get_research)
+    )
+    
+    bundle = create_bundle(quiz_id, raw_bundle)
+    await save_quiz(bundle)
+    quiz_store.put_research(quiz_id, research)
+    return bundle, research
+
+async def build_quiz(quiz_id: UUID, payload: GenerateQuizRequest) -> QuizBundle:
+    """Generate and store a quiz (without research) under ``quiz_id``."""
+    # Generate quiz with LLM using fallback prompt; identical concurrent requests share one call
+    key = generation_key(
+        "quiz", payload.topic, payload.difficulty, payload.num_questions, str(payload.chunk_size or QUIZ_CHUNK_SIZE)
+    )
+    raw_bundle = await generation_flight.do(
+        key, lambda: generate_questions(payload.topic, payload.difficulty, payload.num_questions, payload.chunk_size)
+    )
+    
+    bundle = create_bundle(quiz_id, raw_bundle)
+    await save_quiz(bundle)
+    return bundle
+
+async def bank_quiz(quiz_id: UUID, payload: GenerateQuizRequest) -> Optional[QuizBundle]:
+    """Assemble and store a quiz from banked questions, if the bank can serve the request alone."""
+    await question_bank.warm(payload.topic, payload.difficulty)
+    available = question_bank.size(payload.topic, payload.difficulty)
+    if not available or (available < payload.num_questions and payload.top_up):
+        return None
+    banked = question_bank.sample(payload.topic, payload.difficulty, payload.num_questions)
+    bundle = create_bundle(quiz_id, QuizBundleLLM(topic=payload.topic, difficulty=payload.difficulty, questions=banked))
+    quiz_store.put_quiz(bundle)
+    return bundle
+
+async def build_topped_up_quiz(quiz_id: UUID, payload: GenerateQuizRequest) -> QuizBundle:
+    """Fill a quiz with banked questions and generate only the missing ones."""
+    await question_bank.warm(payload.topic, payload.difficulty)
+    banked = question_bank.sample(payload.topic, payload.difficulty, payload.num_questions)
+    fresh: List[QuizQuestion] = []
+    if len(banked) < payload.num_questions:
+        # A cached response would only repeat questions the bank already has
+        with llm_client.fresh_responses():
+            raw_bundle = await generate_questions(
+                payload.topic, payload.difficulty, payload.num_questions - len(banked), payload.chunk_size
+            )
+        # Only questions the bank has not seen are used, which also banks them
+        fresh = question_bank.add(payload.topic, payload.difficulty, raw_bundle.questions)
+    questions = merge_questions(
+        [QuizBundleLLM(topic=payload.topic, difficulty=payload.difficulty, questions=banked + fresh)],
+        payload.num_questions
+    )
+    bundle = create_bundle(quiz_id, QuizBundleLLM(topic=payload.topic, difficulty=payload.difficulty, questions=questions))
+    quiz_store.put_quiz(bundle)
+    return bundle
+
+def shared_research(requests: List[AgenticQuizRequest]) -> Dict[Tuple[str, str], Callable[[], Awaitable[TopicResearch]]]:
+    """One research run per (topic, research_depth), covering every difficulty requested for it."""
+    difficulties: Dict[Tuple[str, str], List[str]] = {}
+    topics: Dict[Tuple[str, str], str] = {}
+    for request in requests:
+        group = (normalize_key_part(request.topic), normalize_key_part(request.research_depth))
+        topics.setdefault(group, request.topic)
+        levels = difficulties.setdefault(group, [])
+        if request.difficulty not in levels:
+            levels.append(request.difficulty)
+    
+    providers: Dict[Tuple[str, str], Callable[[], Awaitable[TopicResearch]]] = {}
+    for group, levels in difficulties.items():
+        # Started lazily by the first job that needs it, then shared by the rest
+        task: List[asyncio.Future] = []
         
-        QUIZ_DB[quiz_id] = bundle
+        def provider(topic=topics[group], difficulty=", ".join(levels), depth=group[1], task=task):
+            if not task:
+                task.append(asyncio.ensure_future(research_topic(topic, difficulty, depth)))
+            return asyncio.shield(task[0])
         
+        providers[group] = provider
+    return providers
+
+def enqueue_job(quiz_id: UUID, kind: str, run, payload) -> QuizJob:
+    """Submit generation work to the background queue, shedding load when it is full."""
+    try:
+        return job_queue.submit(quiz_id, kind, run, topic=payload.topic, difficulty=payload.difficulty)
+    except QueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+# ---- Streaming Generation ----
+
+async def stream_questions(prompt: PromptTemplate, inputs: Dict) -> AsyncIterator[QuizQuestion]:
+    """Yield validated questions as soon as they are parsed from the model's token stream."""
+    stream_parser = QuestionStreamParser()
+    async for chunk in llm_client.astream(prompt, inputs):
+        for raw_question in stream_parser.feed(chunk.content):
+            try:
+                question = validate_question(QuizQuestion.model_validate(raw_question))
+            except ValidationError as e:
+                logger.warning(f"Skipping invalid streamed question: {e}")
+                continue
+            if question is not None:
+                yield question
+
+def unavailable_event(error: LLMUnavailableError) -> str:
+    """Error event for a shed LLM call, carrying what the HTTP API puts in its status and Retry-After."""
+    return ndjson_event(
+        "error", detail=str(error), status_code=error.status_code,
+        retry_after=int(error.headers()["Retry-After"]),
+    )
+
+async def quiz_events(
+    quiz_id: UUID,
+    topic: str,
+    difficulty: str,
+    attempts: List[Tuple[PromptTemplate, Dict]],
+    research: Optional[TopicResearch] = None,
+) -> AsyncIterator[str]:
+    """Stream question events, trying each (prompt, inputs) attempt until one yields questions."""
+    questions: List[QuizQuestion] = []
+    error: Optional[Exception] = None
+    for prompt, inputs in attempts:
+        try:
+            async for question in stream_questions(prompt, inputs):
+                questions.append(question)
+                yield ndjson_event("question", question=question.model_dump())
+            if questions:
+                break
+            error = ValueError("No questions generated by LLM")
+        except LLMUnavailableError as e:
+            logger.warning(f"Streaming quiz generation shed: {e}")
+            # Trying the next attempt would only add load to an overloaded LLM
+            if not questions:
+                yield unavailable_event(e)
+                return
+            break
+        except Exception as e:
+            logger.error(f"Streaming quiz generation failed: {e}")
+            error = e
+            # Questions already sent to the client cannot be retracted
+            if questions:
+                break
+    
+    if not questions:
+        yield ndjson_event("error", detail=f"Failed to generate quiz: {error}")
+        return
+    
+    bundle = create_bundle(quiz_id, QuizBundleLLM(topic=topic, difficulty=difficulty, questions=questions))
+    await save_quiz(bundle)
+    if research is not None:
+        quiz_store.put_research(quiz_id, research)
+    yield ndjson_event("completed", quizId=quiz_id, num_questions=len(questions))
+
+async def agentic_quiz_events(quiz_id: UUID, payload: AgenticQuizRequest) -> AsyncIterator[str]:
+    """Research progress events followed by streamed questions for an agentic quiz."""
+    yield ndjson_event("research_started", quizId=quiz_id, topic=payload.topic)
+    try:
+        research = await research_topic(payload.topic, payload.difficulty, payload.research_depth)
+    except LLMUnavailableError as e:
+        logger.warning(f"Streaming research shed: {e}")
+        yield unavailable_event(e)
+        return
+    except Exception as e:
+        logger.error(f"Streaming research failed: {e}")
+        yield ndjson_event("error", detail=f"Failed to research topic: {e}")
+        return
+    yield ndjson_event(
+        "research_completed",
+        research_summary=research.research_summary,
+        key_concepts=research.key_concepts,
+        sources=[source.source for source in research.sources],
+    )
+    
+    fallback_inputs = {"topic": payload.topic, "num_questions": payload.num_questions, "difficulty": payload.difficulty}
+    attempts = [
+        (quiz_generation_prompt, research_prompt_inputs(research, payload.topic, payload.difficulty, payload.num_questions)),
+        (fallback_quiz_prompt, fallback_inputs),
+    ]
+    async for event in quiz_events(quiz_id, payload.topic, payload.difficulty, attempts, research):
+        yield event
+
+# ---- Endpoints ----
+
+@router.post("/generate-agentic", response_model=AgenticQuizResponse, status_code=201)
+async def generate_agentic_quiz(payload: AgenticQuizRequest, response: Response, background: bool = False):
+    """
+    Generate a quiz using agentic approach: research the topic first, then create questions.
+    With ``background=true`` the work is queued and a pending quiz is returned immediately
+    (HTTP 202); poll ``GET /api/quiz/{quiz_id}`` for the result.
+    """
+    quiz_id = uuid4()
+    
+    if background:
+        enqueue_job(quiz_id, "agentic", lambda: build_agentic_quiz(quiz_id, payload), payload)
+        response.status_code = 202
         return AgenticQuizResponse(
-            quizId=bundle.quizId,
-            topic=bundle.topic,
-            difficulty=bundle.difficulty,
-            status="completed",
-            questions=bundle.questions,
-            research_summary=research.research_summary,
-            key_concepts=research.key_concepts,
-            sources=research.sources
+            quizId=quiz_id,
+            topic=payload.topic,
+            difficulty=payload.difficulty,
+            status=PENDING,
+            questions=[],
+            research_summary="",
+            key_concepts=[],
+            sources=[]
         )
-        
+    
+    try:
+        bundle, research = await build_agentic_quiz(quiz_id, payload)
+    except LLMUnavailableError:
+        # Shed with 429/503 and Retry-After by the app's exception handler
+        raise
+    except asyncio.TimeoutError as e:
+        raise HTTPException(status_code=504, detail=f"Failed to generate quiz: {str(e) or 'timed out'}")
     except Exception as e:
-        logger.error(f"Failed to generate agentic quiz: {e}")
-        
-        # Fallback: Generate quiz without research
-        try:
-            fallback_chain = fallback_quiz_prompt | structured_llm
-            raw_bundle: QuizBundleLLM = await asyncio.get_event_loop().run_in_executor(
-                None,
-                lambda: fallback_chain.invoke({
-                    "topic": payload.topic,
-                    "num_questions": payload.num_questions,
-                    "difficulty": payload.difficulty
-                })
-            )
-            
-            bundle = QuizBundle(
-                quizId=quiz_id,
-                topic=raw_bundle.topic,
-                difficulty=raw_bundle.difficulty,
-                createdAt=datetime.utcnow().isoformat(),
-                questions=raw_bundle.questions
-            )
-            
-            QUIZ_DB[quiz_id] = bundle
-            
-            # Create minimal research data for fallback
-            fallback_research = TopicResearch(
-                topic=payload.topic,
-                research_summary=f"Quiz generated for {payload.topic}",
-                key_concepts=[payload.topic],
-                difficulty_appropriate_facts=[],
-                sources=[]
-            )
-            RESEARCH_DB[quiz_id] = fallback_research
-            
-            return AgenticQuizResponse(
-                quizId=bundle.quizId,
-                topic=bundle.topic,
-                difficulty=bundle.difficulty,
-                status="completed",
-                questions=bundle.questions,
-                research_summary=fallback_research.research_summary,
-                key_concepts=fallback_research.key_concepts,
-                sources=fallback_research.sources
-            )
-            
-        except Exception as fallback_error:
-            logger.error(f"Fallback quiz generation also failed: {fallback_error}")
-            raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {str(e)}")
+    
+    return AgenticQuizResponse(
+        quizId=bundle.quizId,
+        topic=bundle.topic,
+        difficulty=bundle.difficulty,
+        status=COMPLETED,
+        questions=bundle.questions,
+        research_summary=research.research_summary,
+        key_concepts=research.key_concepts,
+        sources=research.sources
+    )
 
 @router.post("/generate", response_model=GenerateQuizResponse, status_code=202)
-async def generate_quiz(payload: GenerateQuizRequest):
+async def generate_quiz(payload: GenerateQuizRequest, response: Response):
     """
-    Generate a new quiz with the specified topic, difficulty, and number of questions.
+    Queue generation of a new quiz with the specified topic, difficulty, and number of questions.
+    Returns immediately; poll ``GET /api/quiz/{quiz_id}`` until its status is completed or failed.
+    With ``from_bank`` the quiz is assembled from previously generated questions (HTTP 201) and,
+    with ``top_up``, only the missing questions are generated. Popular requests configured in
+    ``QUIZ_POOL_BUCKETS`` are served from a pre-generated pool (HTTP 201) when one is ready.
     """
     quiz_id = uuid4()
+    if payload.from_bank:
+        if await bank_quiz(quiz_id, payload) is not None:
+            response.status_code = 201
+            return GenerateQuizResponse(message="Quiz assembled from question bank", quizId=quiz_id)
+        if not payload.top_up:
+            raise HTTPException(status_code=404, detail="No banked questions for this topic and difficulty")
+        enqueue_job(quiz_id, "quiz", lambda: build_topped_up_quiz(quiz_id, payload), payload)
+    else:
+        pooled = quiz_pool.take(payload.topic, payload.difficulty, payload.num_questions)
+        if pooled is not None:
+            await save_quiz(create_bundle(quiz_id, pooled))
+            response.status_code = 201
+            return GenerateQuizResponse(message="Quiz served from pre-generated pool", quizId=quiz_id)
+        enqueue_job(quiz_id, "quiz", lambda: build_quiz(quiz_id, payload), payload)
 
-    try:
-        # Generate quiz with LLM using fallback prompt
-        raw_bundle: QuizBundleLLM = await asyncio.get_event_loop().run_in_executor(
-            None,
-            lambda: structured_llm.invoke({
-                "topic": payload.topic,
-                "num_questions": payload.num_questions,
-                "difficulty": payload.difficulty
-            })
-        )
-
-        # Validate that questions were generated
-        if not raw_bundle.questions:
-            raise ValueError("No questions generated by LLM")
+    return GenerateQuizResponse(
+        message="Quiz generation started",
+        quizId=quiz_id
+    )
 
-        # Attach metadata (convert to full QuizBundle)
-        bundle = QuizBundle(
-            quizId=quiz_id,
-            topic=raw_bundle.topic,
-            difficulty=raw_bundle.difficulty,
-            createdAt=datetime.utcnow().isoformat(),
-            questions=raw_bundle.questions
-        )
+@router.post("/generate-batch", response_model=BatchQuizResponse, status_code=202)
+async def generate_batch(payload: BatchQuizRequest):
+    """
+    Queue several agentic quizzes at once. Requests for the same topic and research depth share
+    a single research run across their difficulties; LLM calls run concurrently under the global
+    LLM concurrency limit. Poll ``GET /api/quiz/{quiz_id}`` for each quiz.
+    """
+    providers = shared_research(payload.requests)
+    items: List[BatchQuizItem] = []
+    for request in payload.requests:
+        quiz_id = uuid4()
+        get_research = providers[(normalize_key_part(request.topic), normalize_key_part(request.research_depth))]
+        try:
+            job_queue.submit(
+                quiz_id, "agentic",
+                lambda quiz_id=quiz_id, request=request, get_research=get_research:
+                    build_agentic_quiz(quiz_id, request, get_research),
+                topic=request.topic, difficulty=request.difficulty
+            )
+        except QueueFullError as e:
+            items.append(BatchQuizItem(topic=request.topic, difficulty=request.difficulty, status=FAILED, error=str(e)))
+            continue
+        items.append(BatchQuizItem(quizId=quiz_id, topic=request.topic, difficulty=request.difficulty, status=PENDING))
+    
+    return BatchQuizResponse(quizzes=items)
 
-        QUIZ_DB[quiz_id] = bundle
+@router.post("/generate-agentic/stream")
+async def stream_agentic_quiz(payload: AgenticQuizRequest):
+    """
+    Generate an agentic quiz and stream progress as NDJSON: research events, then each
+    question as soon as the model produces it, then a final completed (or error) event.
+    """
+    quiz_id = uuid4()
+    return StreamingResponse(agentic_quiz_events(quiz_id, payload), media_type=NDJSON_MEDIA_TYPE)
 
-        return GenerateQuizResponse(
-            message="Quiz generated successfully",
-            quizId=quiz_id
-        )
-        
-    except Exception as e:
-        logger.error(f"Failed to generate quiz: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {str(e)}")
+@router.post("/generate/stream")
+async def stream_quiz(payload: GenerateQuizRequest):
+    """
+    Generate a quiz and stream each question as NDJSON as soon as the model produces it.
+    """
+    quiz_id = uuid4()
+    inputs = {"topic": payload.topic, "num_questions": payload.num_questions, "difficulty": payload.difficulty}
+    events = quiz_events(quiz_id, payload.topic, payload.difficulty, [(fallback_quiz_prompt, inputs)])
+    return StreamingResponse(events, media_type=NDJSON_MEDIA_TYPE)
 
 @router.post("/generate-and-return", response_model=QuizDetailResponse, status_code=201)
 async def generate_quiz_and_return(payload: GenerateQuizRequest):
@@ -473,36 +1126,95 @@ async def generate_quiz_and_return(payload: GenerateQuizRequest):
     This endpoint combines generate + get_quiz to reduce redundancy.
     """
     try:
-        # Step 1: Generate the quiz (reuse existing logic)
-        generate_response = await generate_quiz(payload)
+        # Step 1: Queue the quiz (reuse existing logic) and wait for the job
+        generate_response = await generate_quiz(payload, Response())
         quiz_id = generate_response.quizId
+        # Quizzes assembled without a generation job have nothing to wait for
+        job = job_queue.get(quiz_id)
+        if job is not None:
+            await job.wait()
+            if isinstance(job.exception, LLMUnavailableError):
+                raise job.exception
+            if job.status == FAILED:
+                raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {job.error}")
         
         # Step 2: Get the full quiz details (reuse existing logic)
         quiz_details = await get_quiz(quiz_id)
         
         return quiz_details
         
-    except HTTPException:
-        # Re-raise HTTP exceptions as-is
+    except (HTTPException, LLMUnavailableError):
+        # Re-raise HTTP errors and load shedding as-is
         raise
     except Exception as e:
         logger.error(f"Failed to generate and return quiz: {e}")
         raise HTTPException(status_code=500, detail=f"Failed to generate quiz: {str(e)}")
 
+@router.get("/metrics")
+async def get_metrics():
+    """
+    Report cache, request coalescing, job queue, store and LLM statistics for the quiz service.
+    """
+    return {
+        "research_cache": research_cache.stats() if research_cache is not None else None,
+        "page_cache": page_cache.stats() if page_cache is not None else None,
+        "research_coalescing": research_flight.stats(),
+        "generation_coalescing": generation_flight.stats(),
+        "jobs": job_queue.stats(),
+        "store": quiz_store.stats(),
+        "question_bank": question_bank.stats(),
+        "quiz_pool": quiz_pool.stats(),
+        "agentic_hedging": dict(hedge_stats),
+        "output_repair": dict(repair_stats),
+        "llm": llm_client.stats(),
+    }
+
+async def wait_for_quiz(quiz_id: UUID, timeout: float) -> Optional[QuizBundle]:
+    """Long-poll for a quiz, waiting on the local job or polling the shared store."""
+    job = job_queue.get(quiz_id)
+    if job is not None:
+        await job.wait(timeout)
+        return quiz_store.get_quiz(quiz_id)
+    
+    # The job runs in another worker process
+    loop = asyncio.get_event_loop()
+    deadline = loop.time() + timeout
+    while loop.time() < deadline:
+        status = quiz_store.get_status(quiz_id)
+        if status is None or status.status in (COMPLETED, FAILED):
+            break
+        await asyncio.sleep(min(LONG_POLL_INTERVAL_SECONDS, max(0.0, deadline - loop.time())))
+    return quiz_store.get_quiz(quiz_id)
+
 @router.get("/{quiz_id}", response_model=QuizDetailResponse)
-async def get_quiz(quiz_id: UUID):
+async def get_quiz(quiz_id: UUID, wait: float = 0):
     """
     Retrieve a generated quiz by its ID.
+    While the quiz is still being generated its status is pending or running; pass
+    ``wait`` (seconds) to long-poll until the job finishes.
     """
-    quiz = QUIZ_DB.get(quiz_id)
+    quiz = quiz_store.get_quiz(quiz_id)
+    if not quiz and wait > 0:
+        quiz = await wait_for_quiz(quiz_id, min(wait, LONG_POLL_MAX_SECONDS))
+    
     if not quiz:
-        raise HTTPException(status_code=404, detail="Quiz not found")
+        status = quiz_store.get_status(quiz_id)
+        if status is None:
+            raise HTTPException(status_code=404, detail="Quiz not found")
+        return QuizDetailResponse(
+            quizId=quiz_id,
+            topic=status.topic,
+            difficulty=status.difficulty,
+            status=status.status,
+            questions=[],
+            error=status.error
+        )
 
     return QuizDetailResponse(
         quizId=quiz.quizId,
         topic=quiz.topic,
         difficulty=quiz.difficulty,
-        status="completed",
+        status=COMPLETED,
         questions=quiz.questions
     )
 
@@ -511,7 +1223,7 @@ async def get_quiz_research(quiz_id: UUID):
     """
     Retrieve the research data used to generate a quiz.
     """
-    research = RESEARCH_DB.get(quiz_id)
+    research = quiz_store.get_research(quiz_id)
     if not research:
         raise HTTPException(status_code=404, detail="Research data not found")
     
@@ -522,71 +1234,42 @@ async def submit_quiz(quiz_id: UUID, payload: SubmitQuizRequest):
     """
     Submit answers for a quiz and get evaluation results.
     """
-    quiz = QUIZ_DB.get(quiz_id)
-    if not quiz:
+    key = quiz_store.get_answer_key(quiz_id)
+    if key is None:
+        if quiz_store.get_status(quiz_id) is not None:
+            raise HTTPException(status_code=409, detail="Quiz is not ready yet")
         raise HTTPException(status_code=404, detail="Quiz not found")
 
-    results: List[QuestionResult] = []
-    correct_count = 0
-
-    # Evaluate each answer
-    for ans in payload.answers:
-        q = next((q for q in quiz.questions if q.questionId == ans.questionId), None)
-        if not q:
-            logger.warning(f"Question not found: {ans.questionId}")
-            continue
-
-        # Extract correct answer key/value with better error handling
-        try:
-            if not q.correct_answer:
-                logger.warning(f"No correct answer for question: {q.questionId}")
-                continue
-                
-            correct_key, correct_value = list(q.correct_answer.items())[0]
-            is_correct = ans.selectedOption == correct_key
-
-            if is_correct:
-                correct_count += 1
-
-            results.append(
-                QuestionResult(
-                    questionId=q.questionId,
-                    yourAnswer=ans.selectedOption,
-                    correctOption=correct_key,
-                    isCorrect=is_correct,
-                    explanation=q.explanation or "No explanation available"
-                )
-            )
-        except (IndexError, AttributeError) as e:
-            logger.error(f"Error processing question {q.questionId}: {e}")
-            continue
-
-    total_questions = len(results)  # Use actual processed questions
-    if total_questions == 0:
-        raise HTTPException(status_code=400, detail="No valid questions found to evaluate")
-        
-    score = int((correct_count / total_questions) * 100)
+    try:
+        return grade_submission(key, payload.answers)
+    except NoGradableAnswersError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return SubmitQuizResponse(
-        quizId=quiz.quizId,
-        score=score,
-        correctAnswers=correct_count,
-        totalQuestions=total_questions,
-        results=results
-    )
+@router.post("/submit-bulk", response_model=BulkSubmitResponse)
+async def submit_bulk(payload: BulkSubmitRequest):
+    """
+    Grade many answer sheets, for one or more quizzes, in a single request.
+    """
+    keys: Dict[UUID, AnswerKey] = {}
+    missing: Dict[UUID, str] = {}
+    for quiz_id in {sheet.quizId for sheet in payload.sheets}:
+        key = quiz_store.get_answer_key(quiz_id)
+        if key is not None:
+            keys[quiz_id] = key
+        elif quiz_store.get_status(quiz_id) is not None:
+            missing[quiz_id] = "Quiz is not ready yet"
+        else:
+            missing[quiz_id] = "Quiz not found"
+    return grade_sheets(payload.sheets, keys, missing)
 
 @router.delete("/{quiz_id}")
 async def delete_quiz(quiz_id: UUID):
     """
-    Delete a quiz from the in-memory store.
+    Delete a quiz (with its research data and job status) from the quiz store.
     """
-    if quiz_id not in QUIZ_DB:
+    if not quiz_store.delete(quiz_id):
         raise HTTPException(status_code=404, detail="Quiz not found")
     
-    del QUIZ_DB[quiz_id]
-    
-    # Also delete research data if it exists
-    if quiz_id in RESEARCH_DB:
-        del RESEARCH_DB[quiz_id]
+    job_queue.forget(quiz_id)
     
     return {"message": "Quiz deleted successfully"}
\ No newline at end of file
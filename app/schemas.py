@@ -7,6 +7,9 @@ class GenerateQuizRequest(BaseModel):
     topic: str
     difficulty: str = Field(default="medium", description="Quiz difficulty level")
     num_questions: int = Field(gt=0, le=50, description="Number of questions to generate")
+    chunk_size: Optional[int] = Field(default=None, gt=0, le=50, description="Max questions per parallel LLM call")
+    from_bank: bool = Field(default=False, description="Assemble the quiz from previously generated questions")
+    top_up: bool = Field(default=True, description="With from_bank, generate questions the bank cannot supply")
 
 
 class GenerateQuizResponse(BaseModel):
@@ -39,8 +42,9 @@ class QuizDetailResponse(BaseModel):
     quizId: UUID
     topic: str
     difficulty: str
-    status: str
+    status: str = Field(description="Generation status: pending, running, completed or failed")
     questions: List[QuizQuestion]
+    error: Optional[str] = None
 
 
 class SubmitAnswer(BaseModel):
@@ -68,6 +72,38 @@ class SubmitQuizResponse(BaseModel):
     results: List[QuestionResult]
 
 
+class AnswerSheet(BaseModel):
+    quizId: UUID
+    sheetId: Optional[str] = Field(default=None, description="Client reference echoed back, e.g. a student ID")
+    answers: List[SubmitAnswer]
+
+
+class BulkSubmitRequest(BaseModel):
+    sheets: List[AnswerSheet] = Field(min_length=1, max_length=1000)
+
+
+class SheetResult(BaseModel):
+    quizId: UUID
+    sheetId: Optional[str] = None
+    result: Optional[SubmitQuizResponse] = None
+    error: Optional[str] = None
+
+
+class QuizGradeStats(BaseModel):
+    quizId: UUID
+    sheets: int
+    graded: int
+    meanScore: float
+    minScore: int
+    maxScore: int
+    questionAccuracy: Dict[int, float] = Field(description="Share of graded answers that were correct, per question")
+
+
+class BulkSubmitResponse(BaseModel):
+    results: List[SheetResult]
+    stats: List[QuizGradeStats]
+
+
 # New schemas for agentic quiz generation
 class ResearchInfo(BaseModel):
     source: str
@@ -88,6 +124,23 @@ class AgenticQuizRequest(BaseModel):
     difficulty: str = Field(default="medium", description="Quiz difficulty level")
     num_questions: int = Field(gt=0, le=50, description="Number of questions to generate")
     research_depth: str = Field(default="comprehensive", description="Research depth: basic, comprehensive, or expert")
+    chunk_size: Optional[int] = Field(default=None, gt=0, le=50, description="Max questions per parallel LLM call")
+
+
+class BatchQuizRequest(BaseModel):
+    requests: List[AgenticQuizRequest] = Field(min_length=1, max_length=50)
+
+
+class BatchQuizItem(BaseModel):
+    quizId: Optional[UUID] = None
+    topic: str
+    difficulty: str
+    status: str
+    error: Optional[str] = None
+
+
+class BatchQuizResponse(BaseModel):
+    quizzes: List[BatchQuizItem]
 
 
 class AgenticQuizResponse(BaseModel):
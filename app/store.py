@@ -1,16 +1,592 @@
-from typing import Dict, List
+"""Quiz, research and job-status storage shared by all API workers."""
+
+import asyncio
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from uuid import UUID
 
-from .schemas import HistoryItem, QuizRecord
+from .cache import normalize_key_part
+from .grading import AnswerKey
+from .schemas import QuizBundle, TopicResearch
+
+logger = logging.getLogger(__name__)
+
+QUIZ_STORE_BACKEND = os.getenv("QUIZ_STORE_BACKEND", "sqlite")
+QUIZ_STORE_PATH = os.getenv("QUIZ_STORE_PATH", os.path.join("data", "quizzes.sqlite3"))
+QUIZ_STORE_BATCH_SIZE = int(os.getenv("QUIZ_STORE_BATCH_SIZE", "64"))
+QUIZ_STORE_FLUSH_SECONDS = float(os.getenv("QUIZ_STORE_FLUSH_SECONDS", "0.05"))
+QUIZ_STORE_MAX_RETRIES = int(os.getenv("QUIZ_STORE_MAX_RETRIES", "5"))
+
+QUIZ_RETENTION_MAX_ENTRIES = int(os.getenv("QUIZ_RETENTION_MAX_ENTRIES", "10000"))
+QUIZ_RETENTION_MAX_BYTES = int(os.getenv("QUIZ_RETENTION_MAX_BYTES", str(256 * 1024 * 1024)))
+QUIZ_RETENTION_TTL_SECONDS = float(os.getenv("QUIZ_RETENTION_TTL_SECONDS", str(7 * 24 * 3600)))
+QUIZ_SWEEP_INTERVAL_SECONDS = float(os.getenv("QUIZ_SWEEP_INTERVAL_SECONDS", "60"))
+
+
+class JobStatus(NamedTuple):
+    topic: str
+    difficulty: str
+    status: str
+    error: Optional[str]
+
+
+class RetentionPolicy(NamedTuple):
+    """Limits applied by ``QuizStore.sweep``; a value of 0 disables that limit."""
+    max_entries: int = QUIZ_RETENTION_MAX_ENTRIES
+    max_bytes: int = QUIZ_RETENTION_MAX_BYTES
+    ttl_seconds: float = QUIZ_RETENTION_TTL_SECONDS
+
+
+def expiry_cutoff(ttl_seconds: float) -> str:
+    """``createdAt`` values older than the returned ISO timestamp are expired."""
+    return (datetime.utcnow() - timedelta(seconds=ttl_seconds)).isoformat()
+
+
+class QuizStore(ABC):
+    """Interface for quiz storage backends."""
+
+    def __init__(self):
+        self.evictions = {"expired": 0, "max_entries": 0, "max_bytes": 0}
+        self.last_sweep: Optional[float] = None
+
+    @abstractmethod
+    def put_quiz(self, bundle: QuizBundle) -> None:
+        ...
+
+    @abstractmethod
+    def get_quiz(self, quiz_id: UUID) -> Optional[QuizBundle]:
+        ...
+
+    @abstractmethod
+    def get_answer_key(self, quiz_id: UUID) -> Optional[AnswerKey]:
+        """Return the answer key built when the quiz was stored."""
+
+    @abstractmethod
+    def put_research(self, quiz_id: UUID, research: TopicResearch) -> None:
+        ...
+
+    @abstractmethod
+    def get_research(self, quiz_id: UUID) -> Optional[TopicResearch]:
+        ...
+
+    @abstractmethod
+    def put_status(self, quiz_id: UUID, status: JobStatus) -> None:
+        ...
+
+    @abstractmethod
+    def get_status(self, quiz_id: UUID) -> Optional[JobStatus]:
+        ...
+
+    @abstractmethod
+    def find_by_topic(self, topic: str, limit: int = 20) -> List[QuizBundle]:
+        """Return the most recent quizzes for a topic, newest first."""
+
+    @abstractmethod
+    def delete(self, quiz_id: UUID) -> bool:
+        """Delete a quiz with its research and status. Returns False if it did not exist."""
+
+    @abstractmethod
+    def sweep(self, policy: RetentionPolicy) -> int:
+        """Evict quizzes (with their research and status) beyond ``policy``.
+
+        Blocking; run it off the event loop. Returns the number of evicted quizzes.
+        """
+
+    def flush(self) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+    def _record_sweep(self, reason_counts: Dict[str, int]) -> int:
+        for reason, count in reason_counts.items():
+            self.evictions[reason] += count
+        self.last_sweep = time.time()
+        return sum(reason_counts.values())
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": type(self).__name__, "evictions": dict(self.evictions), "last_sweep": self.last_sweep}
+
+
+class MemoryQuizStore(QuizStore):
+    """Process-local store; quizzes are lost on restart and not shared between workers."""
+
+    def __init__(self):
+        super().__init__()
+        self._quizzes: Dict[UUID, QuizBundle] = {}
+        self._research: Dict[UUID, TopicResearch] = {}
+        self._answer_keys: Dict[UUID, AnswerKey] = {}
+        self._status: Dict[UUID, JobStatus] = {}
+        self._status_times: Dict[UUID, float] = {}
+        self._sizes: Dict[UUID, int] = {}
+        self._lock = threading.Lock()
+
+    def put_quiz(self, bundle: QuizBundle) -> None:
+        size = len(bundle.model_dump_json())
+        key = AnswerKey.from_bundle(bundle)
+        with self._lock:
+            self._quizzes[bundle.quizId] = bundle
+            self._answer_keys[bundle.quizId] = key
+            self._sizes[bundle.quizId] = self._sizes.get(bundle.quizId, 0) + size
+
+    def get_quiz(self, quiz_id: UUID) -> Optional[QuizBundle]:
+        return self._quizzes.get(quiz_id)
+
+    def get_answer_key(self, quiz_id: UUID) -> Optional[AnswerKey]:
+        return self._answer_keys.get(quiz_id)
+
+    def put_research(self, quiz_id: UUID, research: TopicResearch) -> None:
+        size = len(research.model_dump_json())
+        with self._lock:
+            self._research[quiz_id] = research
+            self._sizes[quiz_id] = self._sizes.get(quiz_id, 0) + size
+
+    def get_research(self, quiz_id: UUID) -> Optional[TopicResearch]:
+        return self._research.get(quiz_id)
+
+    def put_status(self, quiz_id: UUID, status: JobStatus) -> None:
+        with self._lock:
+            self._status[quiz_id] = status
+            self._status_times[quiz_id] = time.time()
+
+    def get_status(self, quiz_id: UUID) -> Optional[JobStatus]:
+        with self._lock:
+            return self._status.get(quiz_id)
+
+    def find_by_topic(self, topic: str, limit: int = 20) -> List[QuizBundle]:
+        topic_key = normalize_key_part(topic)
+        with self._lock:
+            matches = [b for b in self._quizzes.values() if normalize_key_part(b.topic) == topic_key]
+        matches.sort(key=lambda b: b.createdAt, reverse=True)
+        return matches[:limit]
+
+    def delete(self, quiz_id: UUID) -> bool:
+        with self._lock:
+            return self._delete(quiz_id)
+
+    def _delete(self, quiz_id: UUID) -> bool:
+        self._research.pop(quiz_id, None)
+        self._answer_keys.pop(quiz_id, None)
+        self._status.pop(quiz_id, None)
+        self._status_times.pop(quiz_id, None)
+        self._sizes.pop(quiz_id, None)
+        return self._quizzes.pop(quiz_id, None) is not None
+
+    def sweep(self, policy: RetentionPolicy) -> int:
+        counts = {"expired": 0, "max_entries": 0, "max_bytes": 0}
+        with self._lock:
+            newest_first = sorted(self._quizzes.values(), key=lambda b: b.createdAt, reverse=True)
+            cutoff = expiry_cutoff(policy.ttl_seconds) if policy.ttl_seconds > 0 else ""
+            total_bytes = 0
+            for index, bundle in enumerate(newest_first):
+                total_bytes += self._sizes.get(bundle.quizId, 0)
+                if bundle.createdAt < cutoff:
+                    reason = "expired"
+                elif policy.max_entries and index >= policy.max_entries:
+                    reason = "max_entries"
+                elif policy.max_bytes and total_bytes > policy.max_bytes:
+                    reason = "max_bytes"
+                else:
+                    continue
+                self._delete(bundle.quizId)
+                counts[reason] += 1
+            # Statuses of failed jobs have no quiz to expire with
+            if policy.ttl_seconds > 0:
+                stale = time.time() - policy.ttl_seconds
+                for quiz_id in [qid for qid, at in self._status_times.items() if at < stale]:
+                    if quiz_id not in self._quizzes:
+                        self._status.pop(quiz_id, None)
+                        del self._status_times[quiz_id]
+        return self._record_sweep(counts)
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        with self._lock:
+            stats.update(quizzes=len(self._quizzes), research=len(self._research), bytes=sum(self._sizes.values()))
+        return stats
+
+
+class _Write(NamedTuple):
+    """A queued write; ``row`` is None for a delete and ``seq`` orders writes for ``flush``."""
+    seq: int
+    table: str
+    quiz_id: str
+    row: Optional[tuple]
+    attempts: int = 0
+
+_UPSERTS = {
+    "quizzes": "INSERT OR REPLACE INTO quizzes (quiz_id, topic_key, difficulty, created_at, payload) VALUES (?, ?, ?, ?, ?)",
+    "research": "INSERT OR REPLACE INTO research (quiz_id, payload) VALUES (?, ?)",
+    "answer_keys": "INSERT OR REPLACE INTO answer_keys (quiz_id, payload) VALUES (?, ?)",
+    "jobs": "INSERT OR REPLACE INTO jobs (quiz_id, topic, difficulty, status, error, updated_at) VALUES (?, ?, ?, ?, ?, ?)",
+}
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS quizzes (
+    quiz_id TEXT PRIMARY KEY,
+    topic_key TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS quizzes_topic ON quizzes (topic_key, created_at);
+CREATE INDEX IF NOT EXISTS quizzes_created ON quizzes (created_at);
+CREATE TABLE IF NOT EXISTS research (
+    quiz_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS answer_keys (
+    quiz_id TEXT PRIMARY KEY,
+    payload TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS jobs (
+    quiz_id TEXT PRIMARY KEY,
+    topic TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    status TEXT NOT NULL,
+    error TEXT,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SQLiteQuizStore(QuizStore):
+    """Embedded persistent store in a WAL-mode SQLite file.
+
+    Several uvicorn workers on one host can share the file. Writes are queued
+    and committed in batches by a background thread; until a write is committed
+    it is served from an in-memory overlay so reads always see this worker's own
+    writes. Reads are primary-key or index lookups on a per-thread connection.
+    Row counts and sizes for ``stats`` need full scans, so they are measured by
+    the writer thread on startup and by each sweep rather than per call.
+    """
+
+    def __init__(self, path: str, batch_size: int = QUIZ_STORE_BATCH_SIZE,
+                 flush_seconds: float = QUIZ_STORE_FLUSH_SECONDS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        super().__init__()
+        self._local = threading.local()
+        self._connect().executescript(_SCHEMA)
+        self._pending: Dict[Tuple[str, str], Optional[tuple]] = {}
+        self._pending_lock = threading.Lock()
+        self._writes: "queue.Queue[Optional[_Write]]" = queue.Queue()
+        self._flushed = threading.Condition()
+        # Sequence numbers of queued writes not yet committed or given up on
+        self._unfinished: set = set()
+        self._next_seq = 0
+        self._batches = 0
+        self.failed_writes = 0
+        self._usage: Dict[str, Any] = {"quizzes": None, "research": None, "bytes": None, "measured_at": None}
+        self._writer = threading.Thread(target=self._write_loop, name="quiz-store-writer", daemon=True)
+        self._writer.start()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ---- Writes ----
+
+    def _enqueue(self, table: str, quiz_id: UUID, row: Optional[tuple]) -> None:
+        key = (table, str(quiz_id))
+        with self._pending_lock:
+            self._pending[key] = row
+            self._next_seq += 1
+            seq = self._next_seq
+            self._unfinished.add(seq)
+        self._writes.put(_Write(seq, table, str(quiz_id), row))
+
+    def _write_loop(self) -> None:
+        conn = self._connect()
+        try:
+            self._measure(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Failed to measure quiz store usage: {e}")
+        while True:
+            first = self._writes.get()
+            if first is None:
+                return
+            batch: List[_Write] = [first]
+            deadline = time.monotonic() + self.flush_seconds
+            stop = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._writes.get(timeout=max(0.0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+            self._commit(conn, batch)
+            if stop:
+                return
+
+    def _execute(self, conn: sqlite3.Connection, batch: List[_Write]) -> None:
+        try:
+            conn.execute("BEGIN")
+            for write in batch:
+                if write.row is None:
+                    conn.execute(f"DELETE FROM {write.table} WHERE quiz_id = ?", (write.quiz_id,))
+                else:
+                    conn.execute(_UPSERTS[write.table], write.row)
+            conn.execute("COMMIT")
+        except Exception:
+            _rollback(conn)
+            raise
+
+    def _commit(self, conn: sqlite3.Connection, batch: List[_Write]) -> None:
+        """Commit a batch; if that fails, commit its writes one by one and retry the failures later."""
+        failed: List[_Write] = []
+        try:
+            self._execute(conn, batch)
+            self._batches += 1
+        except Exception as e:
+            logger.warning(f"Failed to commit {len(batch)} quiz store writes, retrying one by one: {e}")
+            for write in batch:
+                try:
+                    self._execute(conn, [write])
+                    self._batches += 1
+                except Exception as e:
+                    logger.error(f"Failed to write {write.table} row of quiz {write.quiz_id}: {e}")
+                    failed.append(write)
+
+        retries: List[_Write] = []
+        with self._pending_lock:
+            for write in batch:
+                key = (write.table, write.quiz_id)
+                # A newer write of the same row supersedes this one
+                current = self._pending.get(key, ...) is write.row
+                if write in failed and current:
+                    if write.attempts < QUIZ_STORE_MAX_RETRIES:
+                        # Still served from the overlay until the retry succeeds
+                        retries.append(write._replace(attempts=write.attempts + 1))
+                        continue
+                    logger.error(f"Giving up on {write.table} row of quiz {write.quiz_id}")
+                    self.failed_writes += 1
+                # Writes remain readable from the overlay until they hit the database
+                if current:
+                    del self._pending[key]
+                self._unfinished.discard(write.seq)
+        with self._flushed:
+            self._flushed.notify_all()
+        if retries:
+            time.sleep(min(5.0, 0.1 * 2 ** retries[0].attempts))
+            for write in retries:
+                self._writes.put(write)
+
+    def flush(self) -> None:
+        """Block until every write queued before this call has been committed or given up on."""
+        with self._pending_lock:
+            target = self._next_seq
+        with self._flushed:
+            while True:
+                with self._pending_lock:
+                    if not any(seq <= target for seq in self._unfinished):
+                        return
+                self._flushed.wait(timeout=1)
+
+    def close(self) -> None:
+        self.flush()
+        self._writes.put(None)
+        self._writer.join(timeout=5)
+
+    # ---- Reads ----
+
+    def _read(self, table: str, quiz_id: UUID, columns: str) -> Optional[tuple]:
+        key = (table, str(quiz_id))
+        with self._pending_lock:
+            if key in self._pending:
+                return self._pending[key]
+        return self._connect().execute(
+            f"SELECT {columns} FROM {table} WHERE quiz_id = ?", (str(quiz_id),)
+        ).fetchone()
+
+    def put_quiz(self, bundle: QuizBundle) -> None:
+        row = (
+            str(bundle.quizId), normalize_key_part(bundle.topic), bundle.difficulty,
+            bundle.createdAt, bundle.model_dump_json(),
+        )
+        self._enqueue("quizzes", bundle.quizId, row)
+        key = AnswerKey.from_bundle(bundle)
+        self._enqueue("answer_keys", bundle.quizId, (str(bundle.quizId), key.to_json()))
+
+    def get_quiz(self, quiz_id: UUID) -> Optional[QuizBundle]:
+        row = self._read("quizzes", quiz_id, "quiz_id, topic_key, difficulty, created_at, payload")
+        return QuizBundle.model_validate_json(row[4]) if row else None
+
+    def get_answer_key(self, quiz_id: UUID) -> Optional[AnswerKey]:
+        row = self._read("answer_keys", quiz_id, "quiz_id, payload")
+        if row:
+            try:
+                return AnswerKey.from_json(quiz_id, row[1])
+            except ValueError:
+                logger.warning(f"Rebuilding unreadable answer key of quiz {quiz_id}")
+        # Quizzes stored before answer keys existed
+        bundle = self.get_quiz(quiz_id)
+        return AnswerKey.from_bundle(bundle) if bundle else None
+
+    def put_research(self, quiz_id: UUID, research: TopicResearch) -> None:
+        self._enqueue("research", quiz_id, (str(quiz_id), research.model_dump_json()))
+
+    def get_research(self, quiz_id: UUID) -> Optional[TopicResearch]:
+        row = self._read("research", quiz_id, "quiz_id, payload")
+        return TopicResearch.model_validate_json(row[1]) if row else None
+
+    def put_status(self, quiz_id: UUID, status: JobStatus) -> None:
+        row = (str(quiz_id), status.topic, status.difficulty, status.status, status.error, time.time())
+        self._enqueue("jobs", quiz_id, row)
+
+    def get_status(self, quiz_id: UUID) -> Optional[JobStatus]:
+        row = self._read("jobs", quiz_id, "quiz_id, topic, difficulty, status, error")
+        return JobStatus(*row[1:5]) if row else None
+
+    def find_by_topic(self, topic: str, limit: int = 20) -> List[QuizBundle]:
+        self.flush()
+        rows = self._connect().execute(
+            "SELECT payload FROM quizzes WHERE topic_key = ? ORDER BY created_at DESC LIMIT ?",
+            (normalize_key_part(topic), limit),
+        ).fetchall()
+        return [QuizBundle.model_validate_json(row[0]) for row in rows]
+
+    def delete(self, quiz_id: UUID) -> bool:
+        existed = self._read("quizzes", quiz_id, "quiz_id") is not None
+        for table in ("quizzes", "research", "answer_keys", "jobs"):
+            self._enqueue(table, quiz_id, None)
+        return existed
+
+    def sweep(self, policy: RetentionPolicy) -> int:
+        conn = self._connect()
+        counts = {"expired": 0, "max_entries": 0, "max_bytes": 0}
+        if policy.ttl_seconds > 0:
+            counts["expired"] = self._evict(
+                conn, "SELECT quiz_id FROM quizzes WHERE created_at < ?", (expiry_cutoff(policy.ttl_seconds),)
+            )
+            # Statuses of failed jobs have no quiz to expire with
+            conn.execute(
+                "DELETE FROM jobs WHERE updated_at < ? AND quiz_id NOT IN (SELECT quiz_id FROM quizzes)",
+                (time.time() - policy.ttl_seconds,),
+            )
+        if policy.max_entries > 0:
+            counts["max_entries"] = self._evict(
+                conn, "SELECT quiz_id FROM quizzes ORDER BY created_at DESC LIMIT -1 OFFSET ?", (policy.max_entries,)
+            )
+        if policy.max_bytes > 0:
+            counts["max_bytes"] = self._evict(
+                conn,
+                "SELECT quiz_id FROM ("
+                " SELECT q.quiz_id, SUM(length(q.payload) + COALESCE(length(r.payload), 0))"
+                " OVER (ORDER BY q.created_at DESC) AS running_bytes"
+                " FROM quizzes q LEFT JOIN research r ON r.quiz_id = q.quiz_id"
+                ") WHERE running_bytes > ?",
+                (policy.max_bytes,),
+            )
+        self._measure(conn)
+        return self._record_sweep(counts)
+
+    def _evict(self, conn: sqlite3.Connection, select_ids: str, params: tuple) -> int:
+        conn.execute("BEGIN")
+        try:
+            quiz_ids = [(row[0],) for row in conn.execute(select_ids, params).fetchall()]
+            for table in ("quizzes", "research", "answer_keys", "jobs"):
+                conn.executemany(f"DELETE FROM {table} WHERE quiz_id = ?", quiz_ids)
+            conn.execute("COMMIT")
+        except sqlite3.Error:
+            _rollback(conn)
+            raise
+        return len(quiz_ids)
+
+    def _measure(self, conn: sqlite3.Connection) -> None:
+        """Scan row counts and payload sizes for ``stats``. Blocking; never call it on the event loop."""
+        quizzes, quiz_bytes = conn.execute("SELECT COUNT(*), COALESCE(SUM(length(payload)), 0) FROM quizzes").fetchone()
+        research, research_bytes = conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(length(payload)), 0) FROM research"
+        ).fetchone()
+        self._usage = {
+            "quizzes": quizzes, "research": research, "bytes": quiz_bytes + research_bytes, "measured_at": time.time(),
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update(self._usage)
+        stats.update(
+            path=self.path,
+            pending_writes=len(self._pending),
+            committed_batches=self._batches,
+            failed_writes=self.failed_writes,
+        )
+        return stats
+
+
+def _rollback(conn: sqlite3.Connection) -> None:
+    """Roll back the open transaction, if SQLite has not already done so itself."""
+    if conn.in_transaction:
+        try:
+            conn.execute("ROLLBACK")
+        except sqlite3.Error as e:
+            logger.warning(f"Rollback failed: {e}")
+
+
+class RetentionSweeper:
+    """Periodically applies the retention policy without blocking the event loop."""
+
+    def __init__(self, store: QuizStore, policy: Optional[RetentionPolicy] = None,
+                 interval: float = QUIZ_SWEEP_INTERVAL_SECONDS):
+        self.store = store
+        self.policy = policy or RetentionPolicy()
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    async def sweep_once(self) -> int:
+        loop = asyncio.get_event_loop()
+        evicted = await loop.run_in_executor(None, self.store.sweep, self.policy)
+        if evicted:
+            logger.info(f"Retention sweep evicted {evicted} quizzes")
+        return evicted
 
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sweep_once()
+            except Exception as e:
+                logger.error(f"Retention sweep failed: {e}")
 
-# Simulated store just for Phase 1/2
-HARDCODED_USER_ID = UUID("d290f1ee-6c54-4b01-90e6-d701748f0851")
-HARDCODED_ACCESS_TOKEN = "eyJhbGciOiJIUzI1NiIsInR5cCI6IkpXVCJ9..."
-HARDCODED_QUIZ_ID = UUID("f47ac10b-58cc-4372-a567-0e02b2c3d479")
 
-# In-memory stores
-QUIZZES: Dict[UUID, QuizRecord] = {}
-USER_HISTORY: Dict[UUID, List[HistoryItem]] = {}
+def create_quiz_store(backend: str = QUIZ_STORE_BACKEND) -> QuizStore:
+    """Build the configured quiz store ("sqlite" or "memory")."""
+    if backend.lower() == "memory":
+        return MemoryQuizStore()
+    if backend.lower() != "sqlite":
+        logger.warning(f"Unknown quiz store backend '{backend}', using sqlite")
+    return SQLiteQuizStore(QUIZ_STORE_PATH)
 
 
+quiz_store = create_quiz_store()
+retention_sweeper = RetentionSweeper(quiz_store)
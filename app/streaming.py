@@ -0,0 +1,88 @@
+"""Incremental parsing of streamed LLM quiz output and NDJSON event helpers."""
+
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def ndjson_event(event: str, **data: Any) -> str:
+    """Serialize one progress event as a newline-delimited JSON line."""
+    return json.dumps({"event": event, **data}, default=str) + "\n"
+
+
+class QuestionStreamParser:
+    """Pull complete question objects out of a quiz bundle JSON as it streams in.
+
+    The parser scans the accumulated text for the ``"questions"`` array and yields
+    each element as soon as its closing brace arrives, without waiting for the
+    rest of the document. Reasoning blocks (``<think>...</think>``) emitted by
+    some models before the JSON are ignored.
+    """
+
+    def __init__(self):
+        self.text = ""
+        self._array_start: Optional[int] = None
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._object_start = -1
+        self._finished = False
+
+    def feed(self, chunk: str) -> List[Dict[str, Any]]:
+        """Add a chunk of model output and return any newly completed questions."""
+        self.text += chunk
+        if self._array_start is None and not self._locate_array():
+            return []
+        return self._scan()
+
+    def _locate_array(self) -> bool:
+        start = 0
+        if "<think>" in self.text:
+            end_think = self.text.find("</think>")
+            if end_think == -1:
+                return False
+            start = end_think + len("</think>")
+        key = self.text.find('"questions"', start)
+        if key == -1:
+            return False
+        bracket = self.text.find("[", key)
+        if bracket == -1:
+            return False
+        self._array_start = self._pos = bracket + 1
+        return True
+
+    def _scan(self) -> List[Dict[str, Any]]:
+        questions: List[Dict[str, Any]] = []
+        text = self.text
+        while self._pos < len(text) and not self._finished:
+            char = text[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+            elif char == '"':
+                self._in_string = True
+            elif char == "{":
+                if self._depth == 0:
+                    self._object_start = self._pos
+                self._depth += 1
+            elif char == "}":
+                self._depth -= 1
+                if self._depth == 0:
+                    raw = text[self._object_start:self._pos + 1]
+                    try:
+                        questions.append(json.loads(raw))
+                    except json.JSONDecodeError as e:
+                        logger.warning(f"Skipping malformed streamed question: {e}")
+            elif char == "]" and self._depth == 0:
+                self._finished = True
+            self._pos += 1
+        return questions
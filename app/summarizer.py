@@ -0,0 +1,117 @@
+"""Local extractive summarization of research sources, without an LLM call."""
+
+import math
+import re
+from collections import Counter
+from typing import Dict, List, NamedTuple, Sequence
+
+_SENTENCE_SPLIT = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9\"'(])")
+_WORD = re.compile(r"[A-Za-z][A-Za-z0-9'-]*|\d{2,4}")
+_STOPWORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers herself him himself his how however i if in into is it its itself just many may me might
+more most much must my myself no nor not now of off on once one only or other our ours ourselves out over
+own same she should so some such than that the their theirs them themselves then there these they this
+those through to too under until up upon us very was we were what when where which while who whom why will
+with within without would you your yours yourself yourselves new used use using known well like often
+called including include includes however although though since first second also another could
+""".split())
+
+MIN_SENTENCE_WORDS = 6
+MAX_SENTENCE_WORDS = 60
+
+
+class ExtractiveSummary(NamedTuple):
+    summary: str
+    key_concepts: List[str]
+    facts: List[str]
+
+
+def split_sentences(text: str) -> List[str]:
+    sentences = []
+    for block in re.split(r"\s*\n\s*", text):
+        for sentence in _SENTENCE_SPLIT.split(block):
+            sentence = sentence.strip()
+            if MIN_SENTENCE_WORDS <= len(sentence.split()) <= MAX_SENTENCE_WORDS:
+                sentences.append(sentence)
+    return sentences
+
+
+def terms(text: str) -> List[str]:
+    return [w for w in (m.lower() for m in _WORD.findall(text)) if w not in _STOPWORDS and len(w) > 2]
+
+
+def summarize(topic: str, difficulty: str, documents: Sequence[str],
+              max_sentences: int = 5, max_concepts: int = 8, max_facts: int = 8) -> ExtractiveSummary:
+    """Score sentences by TF-IDF over ``documents`` and extract concepts and facts.
+
+    Each document (one research source) counts as a document for IDF, so terms
+    repeated across sources rank higher than a single page's boilerplate.
+    Summary sentences keep their original order; facts favour sentences with
+    numbers, and shorter sentences for easy quizzes.
+    """
+    doc_terms = [terms(doc) for doc in documents]
+    doc_freq: Counter = Counter()
+    for words in doc_terms:
+        doc_freq.update(set(words))
+    # Bigrams repeated across sources make good concepts ("roman empire")
+    for words in doc_terms:
+        doc_freq.update({f"{a} {b}" for a, b in zip(words, words[1:])})
+    num_docs = max(1, len(documents))
+
+    def idf(term: str) -> float:
+        return math.log((1 + num_docs) / (1 + doc_freq[term])) + 1
+
+    term_freq: Counter = Counter()
+    for words in doc_terms:
+        term_freq.update(words)
+        term_freq.update(f"{a} {b}" for a, b in zip(words, words[1:]))
+    weights: Dict[str, float] = {term: count * idf(term) for term, count in term_freq.items()}
+
+    topic_terms = set(terms(topic))
+    scored = []
+    seen = set()
+    for doc_index, doc in enumerate(documents):
+        for position, sentence in enumerate(split_sentences(doc)):
+            key = " ".join(terms(sentence))
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            words = key.split()
+            score = sum(weights.get(w, 0.0) for w in words) / len(words)
+            score *= 1 + 0.5 * len(topic_terms.intersection(words))
+            score *= 1 + 0.5 / (1 + position)  # Lead sentences of a page summarize it
+            scored.append((score, doc_index, position, sentence))
+
+    ranked = sorted(scored, key=lambda item: item[0], reverse=True)
+    summary_items = sorted(ranked[:max_sentences], key=lambda item: (item[1], item[2]))
+    summary = " ".join(item[3] for item in summary_items)
+
+    def fact_score(item) -> float:
+        score, _, _, sentence = item
+        if re.search(r"\d", sentence):
+            score *= 1.3
+        if difficulty.lower() == "easy":
+            score /= math.sqrt(len(sentence.split()))
+        return score
+
+    chosen = {item[3] for item in summary_items}
+    facts = [item[3] for item in sorted(ranked, key=fact_score, reverse=True) if item[3] not in chosen][:max_facts]
+
+    concepts: List[str] = []
+    topic_stems = {word.rstrip("s") for word in topic_terms}
+    chosen_stems: List[set] = []
+    for term, _ in sorted(weights.items(), key=lambda item: item[1] * (1.5 if " " in item[0] else 1), reverse=True):
+        stems = {word.rstrip("s") for word in term.split()}
+        if stems <= topic_stems or doc_freq[term] < min(2, num_docs):
+            continue
+        # Skip words already covered by a chosen phrase, and vice versa
+        if any(stems & concept_stems for concept_stems in chosen_stems):
+            continue
+        chosen_stems.append(stems)
+        concepts.append(term)
+        if len(concepts) >= max_concepts:
+            break
+
+    return ExtractiveSummary(summary, [concept.title() for concept in concepts], facts)
@@ -0,0 +1,7 @@
+import os
+
+# Importing the app builds its LLM clients and stores from the environment
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+os.environ.setdefault("LLM_CACHE_BACKEND", "none")
+os.environ.setdefault("RESEARCH_CACHE_BACKEND", "none")
+os.environ.setdefault("QUIZ_STORE_BACKEND", "memory")
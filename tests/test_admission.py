@@ -0,0 +1,108 @@
+import asyncio
+import json
+
+import pytest
+
+from app.admission import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    OverloadedError,
+    RateLimitedError,
+    TokenBucket,
+)
+from app.routers import quiz
+
+
+def test_token_bucket_allows_burst_then_rejects():
+    bucket = TokenBucket(rate=1.0, burst=3)
+
+    async def take(count):
+        for _ in range(count):
+            await bucket.acquire(max_wait=0.0)
+
+    asyncio.run(take(3))
+    with pytest.raises(RateLimitedError) as info:
+        asyncio.run(take(1))
+    assert info.value.status_code == 429
+    assert 0 < info.value.retry_after <= 1.0
+    assert bucket.rejected == 1
+
+
+def test_token_bucket_waits_for_reserved_token():
+    bucket = TokenBucket(rate=20.0, burst=1)
+
+    async def take_two():
+        loop = asyncio.get_event_loop()
+        start = loop.time()
+        await bucket.acquire(max_wait=1.0)
+        await bucket.acquire(max_wait=1.0)
+        return loop.time() - start
+
+    assert asyncio.run(take_two()) >= 0.04
+
+
+def test_token_bucket_with_zero_rate_is_disabled():
+    bucket = TokenBucket(rate=0, burst=0)
+    asyncio.run(bucket.acquire(max_wait=0.0))
+    assert bucket.rejected == 0
+
+
+def test_circuit_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=30)
+    breaker.before_call()
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as info:
+        breaker.before_call()
+    assert info.value.status_code == 503
+    assert info.value.headers()["Retry-After"] == "30"
+
+
+def test_circuit_breaker_half_open_allows_single_trial():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=30)
+    breaker.record_failure()
+    breaker.opened_at -= 31
+
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    breaker.before_call()
+
+
+def test_circuit_breaker_reopens_when_trial_fails():
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=30)
+    for _ in range(3):
+        breaker.record_failure()
+    breaker.opened_at -= 31
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.trips == 2
+
+
+def test_circuit_breaker_abandoned_trial_frees_the_slot():
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=0)
+    breaker.record_failure()
+    breaker.before_call()
+    breaker.abandon()
+    breaker.before_call()
+    assert breaker.state == HALF_OPEN
+
+
+def test_shed_calls_are_reported_as_stream_error_events():
+    event = json.loads(quiz.unavailable_event(OverloadedError("busy", 2.5)))
+    assert event["event"] == "error"
+    assert (event["status_code"], event["retry_after"]) == (503, 3)
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.routers import quiz
+from app.schemas import QuizBundleLLM, QuizQuestion
+
+
+def question(question_id, text):
+    return QuizQuestion(
+        questionId=question_id,
+        questionText=text,
+        options={"A": "Yes", "B": "No"},
+        correct_answer={"A": "Yes"},
+        explanation="Because.",
+    )
+
+
+def bundle(*texts):
+    return QuizBundleLLM(topic="Rome", difficulty="easy",
+                         questions=[question(i + 1, text) for i, text in enumerate(texts)])
+
+
+def test_chunk_sizes_are_near_equal():
+    assert quiz.chunk_sizes(25, 10) == [9, 8, 8]
+    assert quiz.chunk_sizes(10, 10) == [10]
+    assert quiz.chunk_sizes(3, 0) == [1, 1, 1]
+
+
+def test_merge_questions_drops_duplicates_and_renumbers():
+    merged = quiz.merge_questions([bundle("Who founded Rome?", "When did Rome fall?"),
+                                   bundle("who founded  ROME", "What was the Senate?")], limit=10)
+    assert [q.questionText for q in merged] == ["Who founded Rome?", "When did Rome fall?", "What was the Senate?"]
+    assert [q.questionId for q in merged] == [1, 2, 3]
+    assert len(quiz.merge_questions([bundle("a", "b", "c")], limit=2)) == 2
+
+
+def test_generate_chunked_runs_one_call_per_chunk(monkeypatch):
+    calls = []
+
+    async def ainvoke(prompt, inputs, output=None, postprocess=None, **kwargs):
+        calls.append(inputs)
+        first = int(inputs["chunk_guidance"].split("from ")[1].split(" ")[0])
+        return bundle(*(f"Question {first + i}" for i in range(inputs["num_questions"])))
+
+    monkeypatch.setattr(quiz.llm_client, "ainvoke", ainvoke)
+    inputs = {"topic": "Rome", "difficulty": "easy", "num_questions": 5}
+    result = asyncio.run(quiz.generate_chunked(quiz.fallback_quiz_prompt, inputs, 5, chunk_size=2))
+
+    assert [call["num_questions"] for call in calls] == [2, 2, 1]
+    assert [q.questionText for q in result.questions] == [f"Question {i}" for i in range(1, 6)]
+    assert [q.questionId for q in result.questions] == [1, 2, 3, 4, 5]
@@ -0,0 +1,56 @@
+from app.context_packer import count_tokens, pack_lines, pack_sources, pack_text
+from app.fingerprint import hamming, simhash
+from app.schemas import ResearchInfo
+
+BASE = "Which Roman emperor built the famous wall across northern Britain in AD 122"
+
+
+def test_simhash_is_close_for_near_duplicates_and_far_otherwise():
+    near = simhash(BASE.replace("famous", "well known"))
+    assert hamming(simhash(BASE), simhash(BASE.upper())) == 0
+    assert hamming(simhash(BASE), near) < hamming(simhash(BASE), simhash("What is the boiling point of water"))
+
+
+def test_pack_sources_keeps_relevant_passages_within_budget():
+    relevant = "Hadrian's Wall was built across northern Britain by the Roman army."
+    filler = "Our shop sells garden furniture and outdoor lighting at low prices."
+    sources = [
+        ResearchInfo(source="https://shop.example/", content=filler, relevance_score=0.0),
+        ResearchInfo(source="https://a.example/", content=relevant, relevance_score=0.5),
+    ]
+    packed = pack_sources(sources, "Hadrian's Wall Britain", budget=count_tokens(relevant) + 5)
+    assert packed == f"Source: https://a.example/\nContent: {relevant}"
+
+
+def test_pack_sources_drops_near_duplicate_passages():
+    relevant = "Hadrian's Wall was built across northern Britain by the Roman army."
+    sources = [
+        ResearchInfo(source="https://a.example/", content=relevant, relevance_score=0.5),
+        # The same text scraped from a mirror
+        ResearchInfo(source="https://mirror.example/", content=relevant.replace("army", "army!"), relevance_score=0.5),
+    ]
+    packed = pack_sources(sources, "Hadrian's Wall", budget=1000)
+    assert "a.example" in packed
+    assert "mirror.example" not in packed
+
+
+def test_pack_sources_groups_passages_by_source_in_order():
+    sources = [
+        ResearchInfo(source="https://a.example/", content="Rome was founded in 753 BC.", relevance_score=0.1),
+        ResearchInfo(source="https://b.example/", content="Rome became an empire in 27 BC.", relevance_score=0.9),
+    ]
+    packed = pack_sources(sources, "Rome", budget=1000)
+    assert packed.index("a.example") < packed.index("b.example")
+
+
+def test_pack_lines_drops_near_duplicates_and_stops_at_the_budget():
+    lines = ["Rome was founded in 753 BC", "rome was founded in 753 bc!", "Augustus was the first emperor",
+             "Constantinople fell in 1453"]
+    assert pack_lines(lines, budget=1000) == [lines[0], lines[2], lines[3]]
+    assert pack_lines(lines, budget=count_tokens(lines[0]) + 1) == [lines[0]]
+
+
+def test_pack_text_keeps_whole_sentences():
+    text = "Rome was founded in 753 BC. Augustus was the first emperor. Constantinople fell in 1453."
+    first = "Rome was founded in 753 BC."
+    assert pack_text(text, count_tokens(first) + 1) == first
@@ -0,0 +1,46 @@
+from app.extraction import PageTextExtractor, sniff_encoding
+
+
+def extract(html: bytes, limit: int = 2000, encoding=None, chunk_size: int = 64) -> str:
+    extractor = PageTextExtractor(limit=limit, encoding=encoding)
+    for start in range(0, len(html), chunk_size):
+        if extractor.feed(html[start:start + chunk_size]):
+            break
+    return extractor.close()
+
+
+def test_main_preferred_over_class_matched_div():
+    html = (
+        b'<html><body><div class="dropdown-content"><a>Login</a></div>'
+        b"<main><p>The Roman Empire was the post-Republican state of ancient Rome.</p></main>"
+        b"</body></html>"
+    )
+    assert extract(html) == "The Roman Empire was the post-Republican state of ancient Rome."
+
+
+def test_class_matched_div_used_without_main():
+    html = b'<body><p>Sidebar</p><div class="post-content"><p>Body text</p></div></body>'
+    assert extract(html) == "Body text"
+
+
+def test_whole_page_without_main_region():
+    html = b"<body><script>var x = 1;</script><nav>Menu</nav><p>One</p><p>Two</p></body>"
+    assert extract(html) == "One Two"
+
+
+def test_stops_once_main_reaches_limit():
+    html = b"<main><p>" + b"word " * 200 + b"</p></main>" + b"<p>tail</p>" * 1000
+    extractor = PageTextExtractor(limit=100)
+    assert extractor.feed(html[:2000])
+    assert len(extractor.close()) == 100
+
+
+def test_utf8_without_charset_header():
+    html = "<html><body><main><p>Café über</p></main></body></html>".encode("utf-8")
+    assert extract(html) == "Café über"
+
+
+def test_meta_charset_used_without_header():
+    html = '<html><head><meta charset="iso-8859-1"></head><body><p>Café</p></body></html>'.encode("latin-1")
+    assert sniff_encoding(html) == "iso8859-1"
+    assert extract(html) == "Café"
@@ -0,0 +1,55 @@
+from uuid import uuid4
+
+from app.grading import AnswerKey, grade_sheets, grade_submission
+from app.schemas import AnswerSheet, QuizBundle, QuizQuestion, SubmitAnswer
+
+
+def question(question_id, correct):
+    return QuizQuestion(
+        questionId=question_id, questionText=f"Question {question_id}?",
+        options={"A": "a", "B": "b", "C": "c"}, correct_answer={correct: correct.lower()},
+        explanation=f"Because {correct}",
+    )
+
+
+def bundle(questions):
+    return QuizBundle(quizId=uuid4(), topic="Rome", difficulty="easy", createdAt="2024-01-01", questions=questions)
+
+
+def test_answer_key_round_trip_keeps_positions_with_repeated_ids():
+    key = AnswerKey.from_bundle(bundle([question(1, "A"), question(1, "B"), question(2, "C")]))
+    restored = AnswerKey.from_json(key.quiz_id, key.to_json())
+    assert restored.question_ids == (1, 1, 2)
+    assert restored.correct[restored.index[2]] == "C"
+    assert restored.correct[restored.index[1]] == "A"
+
+
+def test_grade_submission_skips_unknown_questions():
+    key = AnswerKey.from_bundle(bundle([question(1, "A"), question(2, "C")]))
+    result = grade_submission(key, [
+        SubmitAnswer(questionId=1, selectedOption="A"),
+        SubmitAnswer(questionId=2, selectedOption="B"),
+        SubmitAnswer(questionId=7, selectedOption="A"),
+    ])
+    assert (result.correctAnswers, result.totalQuestions, result.score) == (1, 2, 50)
+    assert result.results[1].correctOption == "C"
+    assert result.results[1].explanation == "Because C"
+
+
+def test_grade_sheets_aggregates_per_quiz_with_repeated_ids():
+    key = AnswerKey.from_bundle(bundle([question(1, "A"), question(1, "B"), question(2, "C")]))
+    missing_id = uuid4()
+    sheets = [
+        AnswerSheet(quizId=key.quiz_id, sheetId="s1", answers=[
+            SubmitAnswer(questionId=1, selectedOption="A"), SubmitAnswer(questionId=2, selectedOption="C"),
+        ]),
+        AnswerSheet(quizId=key.quiz_id, sheetId="s2", answers=[SubmitAnswer(questionId=2, selectedOption="A")]),
+        AnswerSheet(quizId=key.quiz_id, sheetId="s3", answers=[SubmitAnswer(questionId=9, selectedOption="A")]),
+        AnswerSheet(quizId=missing_id, sheetId="s4", answers=[SubmitAnswer(questionId=1, selectedOption="A")]),
+    ]
+    response = grade_sheets(sheets, {key.quiz_id: key}, {missing_id: "Quiz not found"})
+
+    assert [r.error for r in response.results] == [None, None, "No valid questions found to evaluate", "Quiz not found"]
+    stats = response.stats[0]
+    assert (stats.sheets, stats.graded, stats.meanScore) == (3, 2, 50.0)
+    assert stats.questionAccuracy == {1: 1.0, 2: 0.5}
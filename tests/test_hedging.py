@@ -0,0 +1,86 @@
+import asyncio
+
+import pytest
+
+from app.admission import OverloadedError
+from app.routers import quiz
+from app.schemas import AgenticQuizRequest, QuizBundleLLM, TopicResearch
+
+PAYLOAD = AgenticQuizRequest(topic="Rome", difficulty="easy", num_questions=3)
+
+
+def bundle(label):
+    return QuizBundleLLM(topic=label, difficulty="easy", questions=[])
+
+
+def research():
+    return TopicResearch(topic="Rome", research_summary="summary", key_concepts=[],
+                         difficulty_appropriate_facts=[], sources=[])
+
+
+@pytest.fixture
+def agentic(monkeypatch):
+    """Patch research and both generation paths; returns the list of calls made."""
+    calls = []
+    monkeypatch.setattr(quiz, "HEDGE_AFTER_SECONDS", 0.05)
+    monkeypatch.setattr(quiz, "AGENTIC_DEADLINE_SECONDS", 1.0)
+
+    def patch(research_delay=0.0, research_error=None, fallback_delay=0.0):
+        async def research_topic(*args):
+            calls.append("research")
+            await asyncio.sleep(research_delay)
+            if research_error is not None:
+                raise research_error
+            return research()
+
+        async def from_research(*args):
+            calls.append("with_research")
+            return bundle("with research")
+
+        async def without_research(*args):
+            calls.append("without_research")
+            await asyncio.sleep(fallback_delay)
+            return bundle("without research")
+
+        monkeypatch.setattr(quiz, "research_topic", research_topic)
+        monkeypatch.setattr(quiz, "generate_questions_from_research", from_research)
+        monkeypatch.setattr(quiz, "generate_questions", without_research)
+        return calls
+
+    return patch
+
+
+def test_fast_research_is_not_hedged(agentic):
+    calls = agentic()
+    _, raw_bundle = asyncio.run(quiz.generate_agentic_questions(PAYLOAD))
+    assert raw_bundle.topic == "with research"
+    assert calls == ["research", "with_research"]
+
+
+def test_slow_research_is_hedged_and_fallback_wins(agentic):
+    calls = agentic(research_delay=0.5)
+    research_result, raw_bundle = asyncio.run(quiz.generate_agentic_questions(PAYLOAD))
+    assert raw_bundle.topic == "without research"
+    assert research_result.sources == []
+    assert calls == ["research", "without_research"]
+
+
+def test_failed_research_falls_back(agentic):
+    calls = agentic(research_error=RuntimeError("search down"))
+    _, raw_bundle = asyncio.run(quiz.generate_agentic_questions(PAYLOAD))
+    assert raw_bundle.topic == "without research"
+    assert "without_research" in calls
+
+
+def test_shed_research_is_not_hedged(agentic):
+    calls = agentic(research_error=OverloadedError("busy", 2))
+    with pytest.raises(OverloadedError):
+        asyncio.run(quiz.generate_agentic_questions(PAYLOAD))
+    assert calls == ["research"]
+
+
+def test_deadline_raises_timeout(agentic, monkeypatch):
+    monkeypatch.setattr(quiz, "AGENTIC_DEADLINE_SECONDS", 0.1)
+    agentic(research_delay=1.0, fallback_delay=1.0)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(quiz.generate_agentic_questions(PAYLOAD))
@@ -0,0 +1,35 @@
+import asyncio
+
+from app import http_client
+
+
+def test_host_slot_limits_concurrency_and_forgets_idle_hosts(monkeypatch):
+    monkeypatch.setattr(http_client, "HTTP_PER_HOST_LIMIT", 2)
+    state = {"active": 0, "peak": 0}
+
+    async def request(url):
+        async with http_client.host_slot(url):
+            state["active"] += 1
+            state["peak"] = max(state["peak"], state["active"])
+            await asyncio.sleep(0.01)
+            state["active"] -= 1
+
+    async def main():
+        await asyncio.gather(*(request(f"https://Example.com/page{i}") for i in range(5)),
+                             request("https://other.org/"))
+        return dict(http_client._host_slots)
+
+    assert asyncio.run(main()) == {}
+    assert state["peak"] == 3  # two for example.com plus one for other.org
+
+
+def test_host_slot_is_released_when_the_request_fails():
+    async def main():
+        try:
+            async with http_client.host_slot("https://example.com/"):
+                raise ValueError("boom")
+        except ValueError:
+            pass
+        return dict(http_client._host_slots)
+
+    assert asyncio.run(main()) == {}
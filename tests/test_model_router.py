@@ -0,0 +1,52 @@
+from app.admission import CircuitBreaker, TokenBucket
+from app.model_router import LARGE, SMALL, Backend, ModelRouter
+
+
+def backend(name, tiers, latencies=()):
+    b = Backend(name, name, None, frozenset(tiers), TokenBucket(0, 1), CircuitBreaker(3, 30), window_seconds=300)
+    for latency in latencies:
+        b.record_success(latency)
+    return b
+
+
+def names(backends):
+    return [b.name for b in backends]
+
+
+def test_fastest_healthy_backend_first_and_unmeasured_probed():
+    slow = backend("slow", [LARGE], [2.0, 2.0])
+    fast = backend("fast", [LARGE], [0.5, 0.7])
+    new = backend("new", [LARGE])
+    assert names(ModelRouter([slow, fast, new], 0.5, 4).candidates(LARGE)) == ["new", "fast", "slow"]
+
+
+def test_small_tier_prefers_small_models_and_falls_back_to_large():
+    large = backend("large", [LARGE], [0.1])
+    small = backend("small", [SMALL], [1.0])
+    router = ModelRouter([large, small], 0.5, 4)
+    assert names(router.candidates(SMALL)) == ["small", "large"]
+    assert names(router.candidates(LARGE)) == ["large"]
+
+
+def test_open_breaker_moves_backend_last():
+    failing = backend("failing", [LARGE], [0.1])
+    for _ in range(3):
+        failing.record_failure()
+    steady = backend("steady", [LARGE], [3.0])
+    router = ModelRouter([failing, steady], 0.5, 4)
+    assert not router.healthy(failing)
+    assert names(router.candidates(LARGE)) == ["steady", "failing"]
+
+
+def test_error_rate_counts_once_enough_samples():
+    flaky = backend("flaky", [LARGE], [0.1])
+    flaky.record_failure()
+    flaky.breaker.record_success()
+    router = ModelRouter([flaky], 0.4, 4)
+    assert router.healthy(flaky)
+    flaky.record_failure()
+    flaky.breaker.record_success()
+    flaky.record_failure()
+    flaky.breaker.record_success()
+    assert flaky.error_rate() == 0.75
+    assert not router.healthy(flaky)
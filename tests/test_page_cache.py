@@ -0,0 +1,54 @@
+from app import cache
+from app.cache import PageCache
+
+
+def test_identical_texts_share_storage():
+    pages = PageCache(max_bytes=1000)
+    pages.store("https://a.example/", "same text", None, None)
+    pages.store("https://b.example/", "same text", None, None)
+    assert pages.stats()["urls"] == 2
+    assert pages.stats()["unique_texts"] == 1
+    assert pages.bytes_used == len("same text")
+
+
+def test_evicts_least_recently_used_urls_to_fit_the_byte_budget():
+    pages = PageCache(max_bytes=25)
+    pages.store("https://a.example/", "a" * 10, None, None)
+    pages.store("https://b.example/", "b" * 10, None, None)
+    pages.lookup("https://a.example/")
+    pages.store("https://c.example/", "c" * 10, None, None)
+    assert pages.lookup("https://b.example/") is None
+    assert pages.lookup("https://a.example/") is not None
+    assert pages.bytes_used == 20
+    assert pages.evictions == 1
+
+
+def test_text_larger_than_the_budget_is_not_cached():
+    pages = PageCache(max_bytes=5)
+    pages.store("https://a.example/", "too long", None, None)
+    assert pages.lookup("https://a.example/") is None
+    assert pages.bytes_used == 0
+
+
+def test_stale_entry_is_revalidated_with_its_validators(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(cache.time, "time", lambda: now[0])
+    pages = PageCache(max_bytes=1000, fresh_seconds=60)
+    pages.store("https://a.example/", "text", '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    now[0] += 120
+    entry = pages.lookup("https://a.example/")
+    assert not pages.is_fresh(entry)
+    assert (entry.etag, entry.last_modified) == ('"v1"', "Mon, 01 Jan 2024 00:00:00 GMT")
+
+    assert pages.revalidated("https://a.example/") == "text"
+    assert pages.is_fresh(pages.lookup("https://a.example/"))
+    assert pages.revalidations == 1
+
+
+def test_replacing_a_url_releases_its_old_text():
+    pages = PageCache(max_bytes=1000)
+    pages.store("https://a.example/", "old", None, None)
+    pages.store("https://a.example/", "newer", None, None)
+    assert pages.stats()["unique_texts"] == 1
+    assert pages.bytes_used == len("newer")
@@ -0,0 +1,66 @@
+import asyncio
+from uuid import uuid4
+
+from app.fingerprint import simhash
+from app.question_bank import QuestionBank, _Bucket
+from app.schemas import QuizBundle, QuizQuestion
+
+BASE = "Which Roman emperor built the famous wall across northern Britain in AD 122"
+
+
+def question(text, question_id=1):
+    return QuizQuestion(questionId=question_id, questionText=text, options={"A": "a", "B": "b"},
+                        correct_answer={"A": "a"}, explanation="")
+
+
+def test_bands_find_every_fingerprint_within_the_max_distance():
+    bucket = _Bucket()
+    fingerprint = simhash(BASE)
+    bucket.add(fingerprint, question(BASE))
+    # Flip three bits in three different bands: at least one band still matches exactly
+    assert bucket.find(fingerprint ^ (1 << 0) ^ (1 << 20) ^ (1 << 40), max_distance=3)
+    assert not bucket.find(fingerprint ^ (1 << 0) ^ (1 << 20) ^ (1 << 40) ^ (1 << 60), max_distance=3)
+    assert not bucket.find(~fingerprint & (2 ** 64 - 1), max_distance=3)
+
+
+def test_add_drops_duplicates_and_sample_renumbers():
+    bank = QuestionBank(max_per_bucket=10)
+    added = bank.add("Rome", "easy", [question(BASE, 4), question(BASE.lower(), 5), question("Who founded Rome", 6)])
+    assert [q.questionId for q in added] == [4, 6]
+    assert bank.size(" rome", "EASY") == 2
+    assert sorted(q.questionId for q in bank.sample("Rome", "easy", 5)) == [1, 2]
+    assert bank.stats()["duplicates_dropped"] == 1
+
+
+def test_buckets_are_capped_in_lru_order():
+    bank = QuestionBank(max_buckets=2)
+    bank.add("a", "easy", [question("question about topic a")])
+    bank.add("b", "easy", [question("question about topic b")])
+    bank.size("a", "easy")
+    bank.add("c", "easy", [question("question about topic c")])
+    # "b" was least recently used
+    assert bank.stats()["evicted_buckets"] == 1
+    assert bank.size("a", "easy") == 1
+    assert bank.size("c", "easy") == 1
+    assert bank.size("b", "easy") == 0
+
+
+def test_warm_loads_each_bucket_once():
+    loads = []
+
+    def loader(topic):
+        loads.append(topic)
+        return [
+            QuizBundle(quizId=uuid4(), topic=topic, difficulty="easy", createdAt="", questions=[question(BASE)]),
+            QuizBundle(quizId=uuid4(), topic=topic, difficulty="hard", createdAt="", questions=[question("Hard one")]),
+        ]
+
+    bank = QuestionBank(loader=loader)
+
+    async def main():
+        await asyncio.gather(bank.warm("Rome", "easy"), bank.warm("rome", "Easy"))
+        await bank.warm("Rome", "easy")
+
+    asyncio.run(main())
+    assert loads == ["Rome"]
+    assert bank.size("Rome", "easy") == 1
@@ -0,0 +1,62 @@
+import asyncio
+
+from app.quiz_pool import PoolBucket, QuizPool, parse_pool_buckets
+from app.schemas import QuizBundleLLM
+
+
+def test_parse_pool_buckets_skips_malformed_items():
+    buckets = parse_pool_buckets("Ancient Rome|medium|5; broken|easy ;Space|hard|x;;Volcanoes | easy | 3")
+    assert buckets == [PoolBucket("Ancient Rome", "medium", 5), PoolBucket("Volcanoes", "easy", 3)]
+
+
+def test_take_serves_ready_quizzes_and_refills_in_the_background():
+    state = {"active": 0, "peak": 0, "generated": 0}
+
+    async def fill(bucket):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        await asyncio.sleep(0.01)
+        state["active"] -= 1
+        state["generated"] += 1
+        return QuizBundleLLM(topic=bucket.topic, difficulty=bucket.difficulty, questions=[])
+
+    async def main():
+        pool = QuizPool([PoolBucket("Rome", "easy", 5), PoolBucket("Mars", "hard", 3)], size=2, fill=fill,
+                        refill_concurrency=1)
+        assert pool.take("Rome", "easy", 5) is None  # Not filled yet
+        await pool.start()
+        await asyncio.sleep(0.2)
+        assert [b["depth"] for b in pool.stats()["buckets"]] == [2, 2]
+
+        assert pool.take(" rome", "EASY", 5).topic == "Rome"
+        assert pool.take("Rome", "easy", 10) is None  # Not a pooled bucket
+        await asyncio.sleep(0.1)
+        stats = pool.stats()
+        await pool.stop()
+        return stats
+
+    stats = asyncio.run(main())
+    assert stats["buckets"][0]["depth"] == 2
+    assert (stats["hits"], stats["misses"], stats["generated"]) == (1, 1, 5)
+    assert state["peak"] == 1
+
+
+def test_failed_refill_is_retried():
+    calls = []
+
+    async def fill(bucket):
+        calls.append(bucket)
+        if len(calls) == 1:
+            raise RuntimeError("LLM down")
+        return QuizBundleLLM(topic=bucket.topic, difficulty=bucket.difficulty, questions=[])
+
+    async def main():
+        pool = QuizPool([PoolBucket("Rome", "easy", 5)], size=1, fill=fill, retry_seconds=0.01)
+        await pool.start()
+        await asyncio.sleep(0.1)
+        stats = pool.stats()
+        await pool.stop()
+        return stats
+
+    stats = asyncio.run(main())
+    assert (stats["failures"], stats["generated"], stats["buckets"][0]["depth"]) == (1, 1, 1)
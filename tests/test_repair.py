@@ -0,0 +1,67 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage
+
+from app.repair import salvage_bundle, validate_question
+from app.routers import quiz
+from app.schemas import QuizBundleLLM, QuizQuestion
+
+
+def question(question_id=1, text="Who founded Rome?", options=None, correct=None):
+    return QuizQuestion(
+        questionId=question_id, questionText=text,
+        options=options if options is not None else {"A": "Romulus", "B": "Caesar"},
+        correct_answer=correct if correct is not None else {"A": "Romulus"}, explanation="Legend says so.",
+    )
+
+
+def test_validate_question_fixes_answer_keys():
+    assert validate_question(question()) == question()
+    fixed = validate_question(question(correct={"Romulus": "Romulus"}))
+    assert fixed.correct_answer == {"A": "Romulus"}
+    assert validate_question(question(correct={"a": "Romulus"})).correct_answer == {"A": "Romulus"}
+
+
+def test_validate_question_drops_ungradable_questions():
+    assert validate_question(question(text="  ")) is None
+    assert validate_question(question(options={"A": "Romulus", "B": " "})) is None
+    assert validate_question(question(correct={"C": "Remus"})) is None
+
+
+def test_salvage_keeps_questions_that_validate_on_their_own():
+    good = question().model_dump()
+    raw = AIMessage(content="", tool_calls=[{
+        "name": "QuizBundleLLM", "id": "call-1",
+        "args": {"topic": "Rome", "questions": [good, {"questionText": "Missing fields"}]},
+    }])
+    bundle = salvage_bundle({"parsed": None, "raw": raw, "parsing_error": ValueError("bad")}, "Rome", "easy")
+    assert bundle.difficulty == "easy"
+    assert bundle.questions == [question()]
+
+
+def test_salvage_raises_the_parsing_error_without_questions():
+    error = ValueError("not json")
+    with pytest.raises(ValueError, match="not json"):
+        salvage_bundle({"parsed": None, "raw": AIMessage(content="oops"), "parsing_error": error}, "Rome", "easy")
+
+
+def test_only_missing_questions_are_regenerated(monkeypatch):
+    calls = []
+
+    async def ainvoke(prompt, inputs, output=None, postprocess=None, **kwargs):
+        calls.append(inputs)
+        if len(calls) == 1:
+            return QuizBundleLLM(topic="Rome", difficulty="easy", questions=[
+                question(1), question(2, "When did Rome fall?"), question(3, "Broken", correct={"Z": "?"}),
+            ])
+        return QuizBundleLLM(topic="Rome", difficulty="easy", questions=[question(1, "What was the Senate?")])
+
+    monkeypatch.setattr(quiz.llm_client, "ainvoke", ainvoke)
+    inputs = {"topic": "Rome", "difficulty": "easy", "num_questions": 3}
+    result = asyncio.run(quiz.generate_chunked(quiz.fallback_quiz_prompt, inputs, 3))
+
+    assert calls[1]["num_questions"] == 1
+    assert "When did Rome fall?" in calls[1]["chunk_guidance"]
+    assert [q.questionText for q in result.questions] == ["Who founded Rome?", "When did Rome fall?", "What was the Senate?"]
+    assert [q.questionId for q in result.questions] == [1, 2, 3]
@@ -0,0 +1,60 @@
+import asyncio
+
+from app.routers import quiz
+
+
+def results(*urls):
+    return [{"href": url, "title": f"Rome {url}"} for url in urls]
+
+
+def patch_pages(monkeypatch, delays, content="Roman history text"):
+    """Serve each URL after its delay; tracks the peak number of concurrent fetches."""
+    state = {"active": 0, "peak": 0, "cancelled": 0}
+
+    async def extract(url):
+        state["active"] += 1
+        state["peak"] = max(state["peak"], state["active"])
+        try:
+            await asyncio.sleep(delays[url])
+            return content if url != "empty" else ""
+        except asyncio.CancelledError:
+            state["cancelled"] += 1
+            raise
+        finally:
+            state["active"] -= 1
+
+    monkeypatch.setattr(quiz, "extract_webpage_content", extract)
+    return state
+
+
+def test_fan_out_is_bounded(monkeypatch):
+    urls = [f"u{i}" for i in range(6)]
+    state = patch_pages(monkeypatch, {url: 0.01 for url in urls})
+    pages = asyncio.run(quiz.fetch_research_pages(results(*urls), "Rome", 2, deadline=5, min_good_pages=10))
+    assert len(pages) == 6
+    assert state["peak"] == 2
+
+
+def test_stops_after_enough_good_pages(monkeypatch):
+    state = patch_pages(monkeypatch, {"a": 0.01, "b": 0.02, "empty": 0.0, "slow": 5})
+    pages = asyncio.run(quiz.fetch_research_pages(results("empty", "a", "b", "slow"), "Rome", 4, 5, 2))
+    assert sorted(page.source for page in pages) == ["a", "b"]
+    assert state["cancelled"] == 1
+
+
+def test_deadline_returns_what_arrived(monkeypatch):
+    state = patch_pages(monkeypatch, {"fast": 0.01, "slow": 5})
+    pages = asyncio.run(quiz.fetch_research_pages(results("fast", "slow"), "Rome", 4, 0.1, 3))
+    assert [page.source for page in pages] == ["fast"]
+    assert state["cancelled"] == 1
+
+
+def test_failed_page_is_skipped(monkeypatch):
+    async def extract(url):
+        if url == "bad":
+            raise RuntimeError("boom")
+        return "text"
+
+    monkeypatch.setattr(quiz, "extract_webpage_content", extract)
+    pages = asyncio.run(quiz.fetch_research_pages(results("bad", "good"), "Rome", 2, 5, 3))
+    assert [page.source for page in pages] == ["good"]
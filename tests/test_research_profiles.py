@@ -0,0 +1,60 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.routers import quiz
+from app.schemas import ResearchInfo
+
+
+def test_unknown_depths_resolve_to_comprehensive():
+    assert quiz.research_profile(" Expert ")[0] == "expert"
+    assert quiz.research_profile("deep")[0] == "comprehensive"
+    assert quiz.research_profile("basic")[1].scrape is False
+
+
+def test_merge_search_results_interleaves_queries_without_repeats():
+    merged = quiz.merge_search_results([
+        [{"href": "a"}, {"href": "b"}],
+        [{"href": "b"}, {"href": "c"}, {"href": "d"}],
+    ])
+    assert [result["href"] for result in merged] == ["a", "b", "c", "d"]
+
+
+def test_basic_search_uses_snippets_without_fetching_pages(monkeypatch):
+    class FakeDDGS:
+        def text(self, query, max_results):
+            return [
+                {"href": f"https://{query}.example/", "title": "Rome history", "body": "Rome was founded."},
+                {"href": "https://empty.example/", "title": "Rome", "body": ""},
+            ]
+
+    async def no_fetch(*args, **kwargs):
+        raise AssertionError("basic research must not fetch pages")
+
+    monkeypatch.setattr(quiz, "DDGS", FakeDDGS)
+    monkeypatch.setattr(quiz, "fetch_research_pages", no_fetch)
+    results = asyncio.run(quiz.search_web("Rome", max_results=3, scrape=False))
+    assert [(r.source, r.content) for r in results] == [("https://Rome.example/", "Rome was founded.")]
+
+
+def test_research_runs_with_the_profile_and_its_remaining_budget(monkeypatch):
+    searches, calls = [], []
+
+    async def search_web(topic, **kwargs):
+        searches.append(kwargs)
+        return [ResearchInfo(source="https://a.example/", content="Rome was founded in 753 BC.", relevance_score=1.0)]
+
+    async def ainvoke(prompt, inputs, **kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(content="Summary:\nRome grew.\nKey Concepts:\n- Republic\nFacts:\n- 753 BC")
+
+    monkeypatch.setattr(quiz, "search_web", search_web)
+    monkeypatch.setattr(quiz.llm_client, "ainvoke", ainvoke)
+    monkeypatch.setattr(quiz, "RESEARCH_SUMMARIZER", "llm")
+    research = asyncio.run(quiz.run_topic_research("Rome", "easy", quiz.RESEARCH_PROFILES["expert"]))
+
+    expert = quiz.RESEARCH_PROFILES["expert"]
+    assert searches[0]["queries"] == [query.format(topic="Rome") for query in expert.queries]
+    assert (searches[0]["max_results"], searches[0]["min_good_pages"]) == (expert.max_results, expert.min_good_pages)
+    assert calls[0]["tier"] == quiz.llm_client.SMALL
+    assert 1.0 <= calls[0]["timeout"] <= expert.budget
+    assert research.sources[0].source == "https://a.example/"
@@ -0,0 +1,63 @@
+import asyncio
+from contextlib import asynccontextmanager
+from types import SimpleNamespace
+
+from langchain_core.messages import AIMessage
+from langchain_core.prompts import PromptTemplate
+from langchain_core.runnables import RunnableLambda
+
+from app import llm
+from app.cache import DiskCache, MemoryCache
+
+PROMPT = PromptTemplate.from_template("Tell me about {topic}")
+
+
+def test_response_key_covers_model_template_output_and_inputs():
+    key = llm.response_key(PROMPT, {"topic": "Rome"}, llm.TEXT, "model-a")
+    assert key == llm.response_key(PROMPT, {"topic": "Rome"}, llm.TEXT, "model-a")
+    assert key != llm.response_key(PROMPT, {"topic": "Rome"}, llm.TEXT, "model-b")
+    assert key != llm.response_key(PROMPT, {"topic": "Rome"}, llm.QUIZ_BUNDLE, "model-a")
+    assert key != llm.response_key(PROMPT, {"topic": "Mars"}, llm.TEXT, "model-a")
+    other = PromptTemplate.from_template("Describe {topic}")
+    assert key != llm.response_key(other, {"topic": "Rome"}, llm.TEXT, "model-a")
+
+
+def test_cached_responses_are_reused_unless_fresh_ones_are_asked_for(monkeypatch):
+    calls = []
+    backend = SimpleNamespace(
+        model_name=llm.router.candidates(llm.LARGE)[0].model_name,
+        bind=lambda output, build: RunnableLambda(lambda prompt: calls.append(prompt) or AIMessage(content="Rome")),
+    )
+
+    @asynccontextmanager
+    async def llm_slot(tier):
+        yield backend
+
+    monkeypatch.setattr(llm, "response_cache", MemoryCache())
+    monkeypatch.setattr(llm, "llm_slot", llm_slot)
+
+    async def main():
+        first = await llm.ainvoke(PROMPT, {"topic": "Rome"})
+        second = await llm.ainvoke(PROMPT, {"topic": "Rome"})
+        with llm.fresh_responses():
+            await llm.ainvoke(PROMPT, {"topic": "Rome"})
+        return first, second
+
+    first, second = asyncio.run(main())
+    assert first.content == second.content == "Rome"
+    assert len(calls) == 2
+
+
+def test_disk_cache_persists_and_evicts_least_recently_used(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+    cache = DiskCache(path, max_entries=2)
+    cache.set("a", {"n": 1})
+    cache.set("b", {"n": 2})
+    assert cache.get("a") == {"n": 1}
+    cache.set("c", {"n": 3})
+    assert cache.get("b") is None
+    assert len(cache) == 2
+
+    reopened = DiskCache(path, max_entries=2)
+    assert asyncio.run(reopened.aget("a")) == {"n": 1}
+    assert len(reopened) == 2
@@ -0,0 +1,148 @@
+from uuid import uuid4
+
+from app import store as store_module
+from app.schemas import QuizBundle, QuizQuestion
+from app.store import JobStatus, MemoryQuizStore, RetentionPolicy, SQLiteQuizStore
+
+
+def quiz(topic="Rome", created_at="2024-01-01T00:00:00"):
+    return QuizBundle(
+        quizId=uuid4(), topic=topic, difficulty="easy", createdAt=created_at,
+        questions=[QuizQuestion(questionId=1, questionText="Capital?", options={"A": "Rome", "B": "Ostia"},
+                                correct_answer={"A": "Rome"}, explanation="It is")],
+    )
+
+
+def sqlite_store(tmp_path, **kwargs):
+    return SQLiteQuizStore(str(tmp_path / "quizzes.sqlite3"), **kwargs)
+
+
+def test_writes_are_readable_before_they_are_committed(tmp_path):
+    # A long flush window keeps the writes in the overlay
+    store = sqlite_store(tmp_path, batch_size=1000, flush_seconds=0.5)
+    bundle = quiz()
+    store.put_quiz(bundle)
+    store.put_status(bundle.quizId, JobStatus("Rome", "easy", "completed", None))
+    assert store.get_quiz(bundle.quizId) == bundle
+    assert store.get_status(bundle.quizId).status == "completed"
+    assert store.get_answer_key(bundle.quizId).correct == ("A",)
+
+    assert store.delete(bundle.quizId)
+    assert store.get_quiz(bundle.quizId) is None
+    store.close()
+
+
+def test_writes_are_committed_in_batches_and_survive_reopening(tmp_path):
+    store = sqlite_store(tmp_path, batch_size=10, flush_seconds=0.05)
+    bundles = [quiz(created_at=f"2024-01-0{day}T00:00:00") for day in range(1, 6)]
+    for bundle in bundles:
+        store.put_quiz(bundle)
+    store.flush()
+    assert store.stats()["pending_writes"] == 0
+    # Each quiz writes a quiz row and an answer key row
+    assert store.stats()["committed_batches"] < 2 * len(bundles)
+    store.close()
+
+    reopened = sqlite_store(tmp_path)
+    assert reopened.get_quiz(bundles[0].quizId) == bundles[0]
+    assert [b.quizId for b in reopened.find_by_topic("  rome ", limit=2)] == [bundles[4].quizId, bundles[3].quizId]
+    reopened.close()
+
+
+def test_failed_batch_is_committed_write_by_write(tmp_path, monkeypatch):
+    store = sqlite_store(tmp_path, batch_size=10, flush_seconds=0.05)
+    execute = store._execute
+
+    def fail_batches(conn, batch):
+        if len(batch) > 1:
+            raise store_module.sqlite3.OperationalError("database is locked")
+        execute(conn, batch)
+
+    monkeypatch.setattr(store, "_execute", fail_batches)
+    bundles = [quiz() for _ in range(3)]
+    for bundle in bundles:
+        store.put_quiz(bundle)
+    store.flush()
+    assert store.stats()["pending_writes"] == 0
+    assert store.stats()["failed_writes"] == 0
+    assert store.stats()["committed_batches"] == 2 * len(bundles)
+    store.close()
+
+    reopened = sqlite_store(tmp_path)
+    assert all(reopened.get_quiz(bundle.quizId) == bundle for bundle in bundles)
+    reopened.close()
+
+
+def test_failed_write_stays_readable_and_is_retried(tmp_path, monkeypatch):
+    store = sqlite_store(tmp_path, batch_size=1, flush_seconds=0.01)
+    execute = store._execute
+    failures = [2]
+
+    def flaky(conn, batch):
+        if failures[0]:
+            failures[0] -= 1
+            raise store_module.sqlite3.OperationalError("disk I/O error")
+        execute(conn, batch)
+
+    monkeypatch.setattr(store, "_execute", flaky)
+    bundle = quiz()
+    store.put_quiz(bundle)
+    assert store.get_quiz(bundle.quizId) == bundle
+    store.flush()
+    assert store.stats()["pending_writes"] == 0
+    store.close()
+
+    reopened = sqlite_store(tmp_path)
+    assert reopened.get_quiz(bundle.quizId) == bundle
+    reopened.close()
+
+
+def test_flush_only_waits_for_earlier_writes(tmp_path):
+    store = sqlite_store(tmp_path, batch_size=10, flush_seconds=0.05)
+    store.put_quiz(quiz())
+    # A write queued after flush was called (here one that never finishes) does not hold it up
+    with store._pending_lock:
+        store._unfinished.add(store._next_seq + 1)
+    store.flush()
+    with store._pending_lock:
+        store._unfinished.clear()
+    store.close()
+
+
+def test_rollback_after_sqlite_already_rolled_back(tmp_path):
+    conn = store_module.sqlite3.connect(str(tmp_path / "rollback.sqlite3"), isolation_level=None)
+    store_module._rollback(conn)
+    conn.execute("BEGIN")
+    store_module._rollback(conn)
+    assert not conn.in_transaction
+    conn.close()
+
+
+def test_sweep_keeps_the_newest_quizzes(tmp_path):
+    for store in (MemoryQuizStore(), sqlite_store(tmp_path)):
+        bundles = [quiz(created_at=f"2024-01-0{day}T00:00:00") for day in range(1, 5)]
+        for bundle in bundles:
+            store.put_quiz(bundle)
+        store.flush()
+        assert store.sweep(RetentionPolicy(max_entries=2, max_bytes=0, ttl_seconds=0)) == 2
+        assert store.get_quiz(bundles[0].quizId) is None
+        assert store.get_quiz(bundles[3].quizId) == bundles[3]
+        assert store.evictions["max_entries"] == 2
+        assert store.stats()["quizzes"] == 2
+        assert store.stats()["bytes"] > 0
+        store.close()
+
+
+def test_sqlite_stats_do_not_scan_the_database(tmp_path, monkeypatch):
+    store = sqlite_store(tmp_path)
+    store.put_quiz(quiz())
+    store.flush()
+    monkeypatch.setattr(store, "_connect", lambda: None)
+    stats = store.stats()
+    # Measured by the writer on startup, refreshed by the next sweep
+    assert stats["quizzes"] == 0
+    assert stats["measured_at"] is not None
+    monkeypatch.undo()
+    store.sweep(RetentionPolicy(max_entries=0, max_bytes=0, ttl_seconds=0))
+    assert store.stats()["quizzes"] == 1
+    store.close()
@@ -0,0 +1,46 @@
+import json
+
+from app.streaming import QuestionStreamParser, ndjson_event
+
+BUNDLE = {
+    "topic": "Rome",
+    "difficulty": "easy",
+    "questions": [
+        {"questionId": 1, "questionText": "Who said \"veni, vidi, vici\"? {x}", "options": {"A": "Caesar"}},
+        {"questionId": 2, "questionText": "Capital?", "options": {"A": "Rome", "B": "Ostia"}},
+    ],
+}
+
+
+def feed_in_chunks(parser, text, size):
+    found = []
+    for start in range(0, len(text), size):
+        found.extend(parser.feed(text[start:start + size]))
+    return found
+
+
+def test_questions_are_yielded_as_they_complete():
+    text = json.dumps(BUNDLE)
+    parser = QuestionStreamParser()
+    first_end = text.index("}}", text.index('"questions"')) + 2
+    assert parser.feed(text[:first_end - 1]) == []
+    assert parser.feed(text[first_end - 1:first_end]) == [BUNDLE["questions"][0]]
+    assert parser.feed(text[first_end:]) == [BUNDLE["questions"][1]]
+
+
+def test_any_chunking_gives_the_same_questions():
+    text = json.dumps(BUNDLE)
+    for size in (1, 3, 7, len(text)):
+        assert feed_in_chunks(QuestionStreamParser(), text, size) == BUNDLE["questions"]
+
+
+def test_reasoning_block_is_skipped():
+    decoy = '{"questions": [{"questionId": 99}]}'
+    text = f"<think>Maybe {decoy}</think>\n```json\n{json.dumps(BUNDLE)}\n```"
+    assert feed_in_chunks(QuestionStreamParser(), text, 5) == BUNDLE["questions"]
+
+
+def test_ndjson_event_is_one_line():
+    line = ndjson_event("error", detail="a\nb", retry_after=3)
+    assert line.endswith("\n") and line.count("\n") == 1
+    assert json.loads(line) == {"event": "error", "detail": "a\nb", "retry_after": 3}
@@ -0,0 +1,43 @@
+from app.summarizer import split_sentences, summarize
+
+DOCUMENTS = [
+    "The Roman Empire was founded when Augustus became the first emperor in 27 BC. "
+    "The Roman Empire controlled the whole Mediterranean coast at its height. "
+    "Cookie settings can be changed at any time from this page.",
+    "Augustus ruled the Roman Empire for more than forty years until 14 AD. "
+    "The Roman Empire split into western and eastern halves in 395 AD. "
+    "Subscribe to our newsletter for weekly history articles and more.",
+    "The western Roman Empire fell in 476 AD when Odoacer deposed the last emperor. "
+    "The eastern Roman Empire survived as the Byzantine Empire until 1453.",
+]
+
+
+def test_split_sentences_drops_fragments():
+    assert split_sentences("Too short. This sentence has enough words to be kept here.\nMenu") == [
+        "This sentence has enough words to be kept here."
+    ]
+
+
+def test_summary_keeps_source_order_and_skips_boilerplate():
+    result = summarize("Roman Empire", "medium", DOCUMENTS, max_sentences=3)
+    sentences = [s for doc in DOCUMENTS for s in split_sentences(doc)]
+    positions = [sentences.index(s) for s in split_sentences(result.summary)]
+    assert len(positions) == 3 and positions == sorted(positions)
+    assert "newsletter" not in result.summary and "Cookie" not in result.summary
+
+
+def test_concepts_repeat_across_sources_and_exclude_the_topic():
+    result = summarize("Roman Empire", "medium", DOCUMENTS)
+    assert "Augustus" in result.key_concepts
+    assert all(concept.lower() not in ("roman", "empire", "roman empire") for concept in result.key_concepts)
+
+
+def test_facts_do_not_repeat_the_summary_and_favour_numbers():
+    result = summarize("Roman Empire", "easy", DOCUMENTS, max_sentences=2, max_facts=3)
+    assert not set(result.facts) & set(split_sentences(result.summary))
+    assert len(result.facts) == 3
+    assert any(char.isdigit() for char in result.facts[0])
+
+
+def test_no_documents():
+    assert summarize("Rome", "easy", []) == ("", [], [])